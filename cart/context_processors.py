@@ -1,13 +1,9 @@
-from .models import Cart
+from .storage import default_storage
 
 def cart_count(request):
-    cid = request.session.get('cart_id')
-    count = 0
-    if cid:
-        try:
-            from uuid import UUID
-            c = Cart.objects.get(id=UUID(cid))
-            count = c.items.count()
-        except Exception:
-            pass
-    return {'cart_count': count}
+    """
+    Contador del header desde el backend del carrito (cart.storage): sesión,
+    cookie o caché; en la BD, a lo sumo una consulta a una sola columna.
+    """
+    storage = getattr(request, 'cart_storage', None) or default_storage(request)
+    return {'cart_count': storage.count()}
@@ -1,24 +1,81 @@
 # cart/management/commands/expire_carts.py
+"""
+Marca como EXPIRADO los carritos abiertos inactivos y borra sus ítems.
+
+Trabaja por lotes: cada lote es una transacción corta con un UPDATE y un
+DELETE por conjuntos (`cart_id IN (...)`), así el lock de escritura de SQLite se
+suelta entre lotes y los checkouts pueden intercalarse.
+
+Uso:
+  python manage.py expire_carts                          # una pasada
+  python manage.py expire_carts --minutes 60 --batch-size 1000
+  python manage.py expire_carts --loop --interval 60     # continuo (daemon), Ctrl+C para salir
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
-from django.conf import settings
-from datetime import timedelta
 
-from cart.models import Cart, CartStatus
+from cart.models import Cart, CartItem, CartStatus
+
 
 class Command(BaseCommand):
-    help = "Marca como EXPIRADO los carritos abiertos inactivos y limpia sus ítems."
+    help = "Marca como EXPIRADO los carritos abiertos inactivos y limpia sus ítems (por lotes)."
 
     def add_arguments(self, parser):
         parser.add_argument("--minutes", type=int, default=getattr(settings, "CART_TTL_MINUTES", 45),
                             help="Minutos de inactividad para expirar (default settings.CART_TTL_MINUTES).")
+        parser.add_argument("--batch-size", type=int, default=500, help="Carritos por transacción (default 500).")
+        parser.add_argument("--pause", type=float, default=0.0,
+                            help="Segundos de espera entre lotes para ceder el lock (default 0).")
+        parser.add_argument("--loop", action="store_true", help="Repite cada --interval segundos hasta Ctrl+C.")
+        parser.add_argument("--interval", type=float, default=60, help="Segundos entre pasadas con --loop (default 60).")
 
     def handle(self, *args, **opts):
+        try:
+            while True:
+                self.run_pass(opts)
+                if not opts["loop"]:
+                    break
+                time.sleep(opts["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrumpido.")
+
+    def run_pass(self, opts):
         ttl = opts["minutes"]
-        limit = timezone.now() - timedelta(minutes=ttl)
-        qs = Cart.objects.filter(estado=CartStatus.ABIERTO, updated_at__lt=limit)
-        total = qs.count()
-        for cart in qs:
-            cart.items.all().delete()
-            cart.expire()  # si no tienes el método, usa: cart.estado = CartStatus.EXPIRADO; cart.save(update_fields=["estado"])
-        self.stdout.write(self.style.SUCCESS(f"Carritos expirados: {total} (>{ttl} minutos)."))
+        start = time.monotonic()
+        total = 0
+        while True:
+            found, expired = self.expire_batch(timezone.now() - timedelta(minutes=ttl), opts["batch_size"])
+            total += expired
+            # se corta por lo leído, no por lo expirado: un carrito que se usó entre
+            # la lectura y el UPDATE no cuenta como expirado pero sí puede quedar más
+            if found < opts["batch_size"]:
+                break
+            if opts["pause"]:
+                time.sleep(opts["pause"])
+        elapsed = time.monotonic() - start
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Carritos expirados: {total} (>{ttl} minutos) en {elapsed:.2f}s ({rate:.0f} carritos/s)."
+        ))
+        return total
+
+    @staticmethod
+    def expire_batch(limit, batch_size):
+        """
+        Expira hasta `batch_size` carritos inactivos desde `limit` en una transacción.
+        Devuelve (carritos leídos, carritos expirados).
+        """
+        stale = Cart.objects.filter(estado=CartStatus.ABIERTO, updated_at__lt=limit)
+        ids = list(stale.order_by("updated_at").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return 0, 0
+        with transaction.atomic():
+            # la condición se repite: un carrito que se usó entre la lectura y el UPDATE se salta
+            expired = stale.filter(id__in=ids).update(estado=CartStatus.EXPIRADO, items_count=0, total=0)
+            CartItem.objects.filter(cart_id__in=ids, cart__estado=CartStatus.EXPIRADO).delete()
+        return len(ids), expired
@@ -0,0 +1,37 @@
+"""
+`request.cart_storage` y `request.cart`: el backend del carrito (cart.storage)
+y el carrito activo, ambos resueltos de forma perezosa.
+
+Las vistas que los usan los obtienen con a lo sumo una resolución por request
+(con la BD, normalmente una consulta, ver cart.utils.get_or_create_active_cart);
+las que no los tocan no pagan nada. En la BD se resuelve en modo lectura: si el
+visitante no tiene carrito es uno virtual, sin fila ni sesión, hasta que agregue
+algo. Al final se deja que cada backend usado escriba sus cookies. Va después
+de SessionMiddleware y AuthenticationMiddleware.
+"""
+from django.utils.functional import SimpleLazyObject, empty
+
+from core import metrics
+
+from .storage import default_storage
+from .utils import AVOIDED
+
+
+class CartMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.cart_storage = SimpleLazyObject(lambda: default_storage(request))
+        request.cart = SimpleLazyObject(lambda: request.cart_storage.cart)
+        response = self.get_response(request)
+        for storage in getattr(request, "_cart_storages", ()):
+            storage.update(response)
+        cart = request.cart
+        resolved = not (isinstance(cart, SimpleLazyObject) and cart._wrapped is empty)
+        # un carrito virtual *vacío*: antes de la creación perezosa esta request habría
+        # insertado un Cart (y una sesión). Los de cookie/caché con líneas son virtuales
+        # siempre y no cuentan; count() no consulta la BD en ningún backend.
+        if resolved and cart.is_virtual and not request.cart_storage.count():
+            metrics.incr(AVOIDED)
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:50
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Cart = apps.get_model("cart", "Cart")
+    CartItem = apps.get_model("cart", "CartItem")
+    items = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+    Cart.objects.update(
+        items_count=Coalesce(Subquery(items.annotate(n=Count("pk")).values("n")), 0),
+        total=Coalesce(
+            Subquery(items.annotate(s=Sum(F("precio_unitario") * F("cantidad"))).values("s")),
+            0,
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cart", "0002_alter_cart_options_alter_cartitem_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cart",
+            name="items_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="cart",
+            name="total",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=12
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
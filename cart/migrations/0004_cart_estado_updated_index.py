@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cart", "0003_cart_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cart",
+            index=models.Index(
+                fields=["estado", "updated_at"], name="cart_cart_estado_960250_idx"
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
-from django.db import models
-from django.db.models import F, Sum
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
 from core.models import UUIDModel, TimeStampedModel
 from catalog.models import Product
 
@@ -16,14 +17,26 @@ class Cart(UUIDModel, TimeStampedModel):
     )
     session_key = models.CharField(max_length=64, blank=True, db_index=True)
     estado = models.CharField(max_length=12, choices=CartStatus.choices, default=CartStatus.ABIERTO)
+    # desnormalizados: se ajustan con F() en cada cambio de ítems (ver apply_delta)
+    items_count = models.PositiveIntegerField(default=0, editable=False)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
 
     class Meta:
         ordering = ["-updated_at"]
+        indexes = [
+            # expire_carts: carritos ABIERTO con updated_at < límite, por lotes
+            models.Index(fields=["estado", "updated_at"]),
+        ]
 
     def __str__(self):
         who = self.usuario.email if self.usuario_id else self.session_key or "anon"
         return f"Cart({who}) [{self.estado}]"
 
+    @property
+    def is_virtual(self):
+        """Carrito sin guardar: el visitante aún no agregó nada (ver cart.utils)."""
+        return self._state.adding
+
     # ————— Operaciones de estado —————
     def lock(self):
         if self.estado == CartStatus.ABIERTO:
@@ -41,24 +54,92 @@ class Cart(UUIDModel, TimeStampedModel):
             self.save(update_fields=["estado"])
 
     # ————— Totales —————
-    @property
-    def total(self):
-        agg = self.items.aggregate(s=Sum(F("precio_unitario") * F("cantidad")))
-        return agg["s"] or 0
+    def apply_delta(self, items=0, amount=0):
+        """
+        Suma `items` líneas y `amount` al total en un UPDATE con F(), atómico
+        aunque haya requests concurrentes sobre el mismo carrito, y recarga los
+        valores en esta instancia.
+        """
+        if not items and not amount:
+            return
+        # updated_at marca actividad: de él depende el vencimiento (cart.utils._is_stale)
+        Cart.objects.filter(pk=self.pk).update(
+            items_count=F("items_count") + items, total=F("total") + amount, updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=["items_count", "total", "updated_at"])
+
+    def clear(self):
+        """Elimina todos los ítems y deja los contadores en cero."""
+        self.items.all().delete()
+        self.updated_at = timezone.now()
+        Cart.objects.filter(pk=self.pk).update(items_count=0, total=0, updated_at=self.updated_at)
+        self.items_count, self.total = 0, 0
+
+    def recalculate(self):
+        """Recalcula los contadores desde los ítems (reparación / datos previos)."""
+        agg = self.items.aggregate(n=Count("id"), s=Sum(F("precio_unitario") * F("cantidad")))
+        self.items_count, self.total = agg["n"], agg["s"] or 0
+        Cart.objects.filter(pk=self.pk).update(items_count=self.items_count, total=self.total)
 
     # ————— Merge —————
     def merge_into(self, other: "Cart"):
-        """Pasa sus items al otro carrito (suma cantidades). No toca el estado."""
-        for it in self.items.select_related("producto"):
-            tgt, created = CartItem.objects.get_or_create(
-                cart=other, producto=it.producto,
-                defaults={"cantidad": it.cantidad, "precio_unitario": it.precio_unitario},
+        """
+        Pasa sus items al otro carrito (suma cantidades). No toca el estado.
+        Por conjuntos: una lectura de los ítems de ambos carritos, un upsert y
+        un borrado, sin importar cuántos ítems tenga.
+        """
+        with transaction.atomic():
+            rows = (
+                CartItem.objects.select_for_update()
+                .filter(cart__in=[self.pk, other.pk])
+                .values_list("cart_id", "producto_id", "cantidad", "precio_unitario")
             )
-            if not created:
-                tgt.cantidad = F("cantidad") + it.cantidad
-                tgt.save(update_fields=["cantidad"])
-        # limpia items del cart origen
-        self.items.all().delete()
+            mine, theirs = [], {}
+            for cart_id, producto_id, cantidad, precio in rows:
+                if cart_id == self.pk:
+                    mine.append((producto_id, cantidad, precio))
+                else:
+                    theirs[producto_id] = (cantidad, precio)
+            if not mine:
+                return
+            other._upsert_lines(mine, theirs)
+            # limpia items del cart origen
+            self.clear()
+
+    def add_lines(self, lines):
+        """
+        Suma `lines` [(producto_id, cantidad, precio_unitario)] con el mismo upsert
+        por conjuntos que merge_into (p.ej. el carrito de cookie/caché al iniciar sesión).
+        """
+        if not lines:
+            return
+        with transaction.atomic():
+            rows = (
+                CartItem.objects.select_for_update()
+                .filter(cart=self, producto_id__in=[producto_id for producto_id, _, _ in lines])
+                .values_list("producto_id", "cantidad", "precio_unitario")
+            )
+            self._upsert_lines(lines, {producto_id: (cantidad, precio) for producto_id, cantidad, precio in rows})
+
+    def _upsert_lines(self, lines, existing):
+        """`existing`: {producto_id: (cantidad, precio)} de este carrito, leído con select_for_update."""
+        merged, new_lines, amount = [], 0, 0
+        for producto_id, cantidad, precio in lines:
+            current = existing.get(producto_id)
+            if current is None:
+                new_lines += 1
+            else:
+                # la línea existente conserva su precio y suma la cantidad
+                precio = current[1]
+                cantidad += current[0]
+                amount -= current[0] * precio
+            merged.append(CartItem(cart=self, producto_id=producto_id, cantidad=cantidad, precio_unitario=precio))
+            amount += cantidad * precio
+        CartItem.objects.bulk_create(
+            merged, update_conflicts=True,
+            unique_fields=["cart", "producto"], update_fields=["cantidad", "updated_at"],
+        )
+        self.apply_delta(items=new_lines, amount=amount)
 
 class CartItem(UUIDModel, TimeStampedModel):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
@@ -1,7 +1,10 @@
 from django.contrib.auth.signals import user_logged_in
 from django.dispatch import receiver
-from .utils import get_or_create_active_cart
+from .storage import persist_anonymous_cart
 
 @receiver(user_logged_in)
 def merge_cart_on_login(sender, request, user, **kwargs):
-        get_or_create_active_cart(request)
+        # el usuario cambió: pasa el carrito anónimo a la BD y resuelve de nuevo
+        # (aunque request.cart ya se hubiera usado en esta request)
+        request.cart_storage = persist_anonymous_cart(request)
+        request.cart = request.cart_storage.cart
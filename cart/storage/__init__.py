@@ -0,0 +1,60 @@
+"""
+Dónde vive el carrito de cada visitante.
+
+    CART_STORAGE_BACKEND = "cart.storage.db.DatabaseStorage"      # Cart/CartItem (por defecto)
+    CART_STORAGE_BACKEND = "cart.storage.cookie.CookieStorage"    # cookie firmada
+    CART_STORAGE_BACKEND = "cart.storage.cache.CacheStorage"      # caché de Django
+
+El backend configurado aplica a los invitados; los usuarios logueados usan
+siempre la BD. Al iniciar sesión el carrito anónimo se pasa a la BD
+(`persist_anonymous_cart`, desde cart.signals) y el checkout exige sesión, así
+que con cookie/caché solo se escribe en la BD al iniciar sesión o al pagar.
+"""
+from uuid import UUID
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from catalog.models import Product
+
+from ..utils import materialize_cart, sync_cart_count
+from .base import BaseCartStorage, CartFull
+from .db import DatabaseStorage
+
+DEFAULT_BACKEND = "cart.storage.db.DatabaseStorage"
+
+
+def anonymous_storage_class():
+    return import_string(getattr(settings, "CART_STORAGE_BACKEND", DEFAULT_BACKEND))
+
+
+def default_storage(request):
+    if request.user.is_authenticated:
+        return DatabaseStorage(request)
+    return anonymous_storage_class()(request)
+
+
+def persist_anonymous_cart(request):
+    """
+    Tras el login: fusiona en la BD el carrito que el invitado tenía en el
+    backend anónimo y lo vacía allí. Devuelve el backend de BD del usuario.
+    """
+    db = DatabaseStorage(request)
+    backend = anonymous_storage_class()
+    if issubclass(backend, DatabaseStorage):
+        return db  # get_active_cart ya fusiona el carrito de sesión con el del usuario
+    anon = backend(request)
+    lines = anon.lines()
+    if lines:
+        prices = dict(
+            Product.objects.filter(id__in=[pid for pid, _ in lines], activo=True).values_list("id", "precio")
+        )
+        prices = {str(pk): precio for pk, precio in prices.items()}
+        lines = [(UUID(pid), qty, prices[pid]) for pid, qty in lines if pid in prices]
+        if lines:
+            request.cart = db._cart = materialize_cart(request)
+            db.cart.add_lines(lines)
+            sync_cart_count(request, db.cart)
+        anon.clear()
+    return db
+
@@ -0,0 +1,238 @@
+"""
+Interfaz común de los backends de carrito y base para los que guardan el
+carrito anónimo fuera de la BD (cookie firmada, caché).
+"""
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.conf import settings
+
+from catalog.models import Product
+
+from ..models import CartStatus
+
+
+class CartFull(ValueError):
+    """El backend no puede guardar más líneas (p.ej. la cookie llegó a su tamaño máximo)."""
+
+
+class BaseCartStorage:
+    """
+    Un backend por request (`request.cart_storage`, ver cart.middleware).
+
+    `cart` es lo que ven las plantillas y las vistas: un `Cart` (BD) o un
+    `StoredCart` con la misma forma (items.all, items_count, total, estado).
+    Las mutaciones devuelven False si el ítem no existe.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        # el middleware llama a update(response) de cada backend usado en la request
+        if not hasattr(request, "_cart_storages"):
+            request._cart_storages = []
+        request._cart_storages.append(self)
+
+    @property
+    def cart(self):
+        raise NotImplementedError
+
+    def count(self):
+        """Líneas del carrito para el header, idealmente sin consultas."""
+        raise NotImplementedError
+
+    def product_ids(self):
+        raise NotImplementedError
+
+    def lines(self):
+        """[(producto_id, cantidad)] para pasar el carrito a la BD."""
+        raise NotImplementedError
+
+    def add(self, product, qty=1):
+        raise NotImplementedError
+
+    def increment(self, item_id):
+        raise NotImplementedError
+
+    def decrement(self, item_id):
+        raise NotImplementedError
+
+    def remove(self, item_id):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def update(self, response):
+        """Escribe en la respuesta lo que el backend necesite (cookies)."""
+
+
+def cart_ttl_seconds():
+    return getattr(settings, "CART_TTL_MINUTES", 45) * 60
+
+
+class StoredItem:
+    def __init__(self, producto, cantidad, precio_unitario):
+        self.producto = producto
+        self.producto_id = producto.id
+        self.id = producto.id  # las URLs de +/−/quitar usan el id del producto
+        self.cantidad = cantidad
+        self.precio_unitario = precio_unitario
+
+    @property
+    def subtotal(self):
+        return self.precio_unitario * self.cantidad
+
+
+class StoredItems:
+    """Imita lo que las plantillas usan de `cart.items`."""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._items = None
+
+    def all(self):
+        if self._items is None:
+            self._items = self._loader()
+        return self._items
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def exists(self):
+        return bool(self.all())
+
+
+class StoredCart:
+    """Carrito anónimo que no vive en la BD. Los productos se cargan en una consulta al pedir los ítems."""
+
+    id = None
+    usuario_id = None
+    estado = CartStatus.ABIERTO
+    is_virtual = True
+
+    def __init__(self, lines, updated):
+        self._lines = lines
+        self.updated_at = datetime.fromtimestamp(updated, tz=timezone.utc) if updated else None
+        self.items = StoredItems(self._load_items)
+
+    # mismo conjunto que items.all(): las líneas de productos desactivados no cuentan
+    @property
+    def items_count(self):
+        return len(self.items.all())
+
+    @property
+    def total(self):
+        return sum((it.subtotal for it in self.items.all()), Decimal("0"))
+
+    def _load_items(self):
+        products = (
+            Product.objects.filter(id__in=list(self._lines), activo=True)
+            .select_related("inventario").in_bulk(field_name="id")
+        )
+        products = {str(pk): p for pk, p in products.items()}
+        return [
+            StoredItem(products[pid], qty, Decimal(precio))
+            for pid, (qty, precio) in reversed(self._lines.items())  # más reciente primero, como Cart
+            if pid in products
+        ]
+
+
+class LineStorage(BaseCartStorage):
+    """
+    Base de los backends que serializan el carrito: {"ts": epoch, "l": {producto_id: [cantidad, "precio"]}}.
+    Las subclases implementan `_load()` y `_store(data)`; el precio se toma del
+    producto al agregar, igual que en la BD.
+    """
+
+    def __init__(self, request):
+        super().__init__(request)
+        self._data = None
+        self._cart = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            data = self._load() or {}
+            if not data.get("l") or data.get("ts", 0) < time.time() - cart_ttl_seconds():
+                data = {"ts": 0, "l": {}}
+            self._data = data
+        return self._data
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _store(self, data):
+        raise NotImplementedError
+
+    def _save(self):
+        self._data["ts"] = int(time.time())
+        self._cart = None
+        self._store(self._data)
+
+    @property
+    def cart(self):
+        if self._cart is None:
+            self._cart = StoredCart(self.data["l"], self.data["ts"])
+        return self._cart
+
+    def count(self):
+        return len(self.data["l"])
+
+    def product_ids(self):
+        return list(self.data["l"])
+
+    def lines(self):
+        return [(pid, qty) for pid, (qty, _) in self.data["l"].items()]
+
+    def add(self, product, qty=1):
+        lines = self.data["l"]
+        pid = str(product.id)
+        previous = lines.pop(pid, None)
+        lines[pid] = [(previous[0] if previous else 0) + qty, str(product.precio)]
+        try:
+            self._save()
+        except CartFull:
+            if previous:
+                lines[pid] = previous
+            else:
+                del lines[pid]
+            raise
+        return True
+
+    def _change(self, item_id, delta):
+        lines = self.data["l"]
+        pid = str(item_id)
+        line = lines.get(pid)
+        if line is None:
+            return False
+        previous = list(line)
+        if line[0] + delta <= 0:
+            del lines[pid]
+        else:
+            line[0] += delta
+        try:
+            self._save()
+        except CartFull:
+            # como en add: el carrito queda como estaba
+            lines[pid] = previous
+            raise
+        return True
+
+    def increment(self, item_id):
+        return self._change(item_id, 1)
+
+    def decrement(self, item_id):
+        return self._change(item_id, -1)
+
+    def remove(self, item_id):
+        if self.data["l"].pop(str(item_id), None) is None:
+            return False
+        self._save()
+        return True
+
+    def clear(self):
+        if self.data["l"]:
+            self.data["l"].clear()
+            self._save()
+        return True
@@ -0,0 +1,55 @@
+"""
+Backend en la caché de Django (CART_STORAGE_CACHE, por defecto "default"):
+el carrito anónimo se guarda bajo un token aleatorio que viaja en una cookie,
+sin sesión ni filas en la BD. Expira a los CART_TTL_MINUTES sin cambios. Con
+LocMemCache cada worker tiene su propia caché, así que en producción hace
+falta una caché compartida (Redis/Memcached).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import get_random_string
+
+from .base import LineStorage, cart_ttl_seconds
+
+COOKIE_NAME = "glowbox_cart_token"
+TOKEN_LENGTH = 32
+
+
+class CacheStorage(LineStorage):
+    def __init__(self, request):
+        super().__init__(request)
+        self.cache = caches[getattr(settings, "CART_STORAGE_CACHE", "default")]
+        self.token = request.COOKIES.get(COOKIE_NAME) or None
+        self._dirty = False
+
+    def _key(self):
+        return f"cart:anon:{self.token}"
+
+    def _load(self):
+        if not self.token or len(self.token) != TOKEN_LENGTH:
+            self.token = None
+            return None
+        return self.cache.get(self._key())
+
+    def _store(self, data):
+        self._dirty = True
+        if not data["l"]:
+            if self.token:
+                self.cache.delete(self._key())
+            return
+        if not self.token:
+            self.token = get_random_string(TOKEN_LENGTH)
+        self.cache.set(self._key(), data, cart_ttl_seconds())
+
+    def update(self, response):
+        if not self._dirty:
+            return
+        if not self.data["l"]:
+            if COOKIE_NAME in self.request.COOKIES:
+                response.delete_cookie(COOKIE_NAME, samesite=settings.SESSION_COOKIE_SAMESITE)
+        else:
+            # renueva el vencimiento de la cookie junto con el de la entrada en caché
+            response.set_cookie(
+                COOKIE_NAME, self.token, max_age=cart_ttl_seconds(), httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE, secure=settings.SESSION_COOKIE_SECURE,
+            )
@@ -0,0 +1,46 @@
+"""
+Backend en una cookie firmada, para carritos anónimos pequeños: agregar al
+carrito no escribe en la BD ni crea sesión. La firma (SECRET_KEY + salt) impide
+que el cliente cambie cantidades o precios. Si la cookie superaría
+CART_COOKIE_MAX_BYTES se rechaza la línea nueva (CartFull).
+"""
+from django.conf import settings
+from django.core import signing
+
+from .base import CartFull, LineStorage, cart_ttl_seconds
+
+COOKIE_NAME = "glowbox_cart"
+SALT = "cart.storage.cookie"
+MAX_BYTES = 3800  # los navegadores garantizan ~4096 por cookie, incluido el nombre y atributos
+
+
+class CookieStorage(LineStorage):
+    def __init__(self, request):
+        super().__init__(request)
+        self._encoded = None
+
+    def _load(self):
+        raw = self.request.COOKIES.get(COOKIE_NAME)
+        if not raw:
+            return None
+        try:
+            return signing.loads(raw, salt=SALT, max_age=cart_ttl_seconds())
+        except signing.BadSignature:
+            return None
+
+    def _store(self, data):
+        encoded = signing.dumps(data, salt=SALT, compress=True) if data["l"] else ""
+        if len(encoded) > getattr(settings, "CART_COOKIE_MAX_BYTES", MAX_BYTES):
+            raise CartFull("Tu carrito alcanzó el máximo de productos para invitados. Inicia sesión para agregar más.")
+        self._encoded = encoded
+
+    def update(self, response):
+        if self._encoded is None:
+            return
+        if self._encoded:
+            response.set_cookie(
+                COOKIE_NAME, self._encoded, max_age=cart_ttl_seconds(), httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE, secure=settings.SESSION_COOKIE_SECURE,
+            )
+        elif COOKIE_NAME in self.request.COOKIES:
+            response.delete_cookie(COOKIE_NAME, samesite=settings.SESSION_COOKIE_SAMESITE)
@@ -0,0 +1,99 @@
+"""
+Backend en la BD (Cart/CartItem). Es el que usan siempre los usuarios
+logueados y, por defecto, también los invitados.
+"""
+from uuid import UUID
+
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Cart, CartItem
+from ..utils import add_product_to_cart, get_active_cart, materialize_cart, sync_cart_count
+from .base import BaseCartStorage
+
+
+class DatabaseStorage(BaseCartStorage):
+    def __init__(self, request):
+        super().__init__(request)
+        self._cart = None
+
+    @property
+    def cart(self):
+        if self._cart is None:
+            self._cart = get_active_cart(self.request)
+        return self._cart
+
+    def count(self):
+        # la sesión lo tiene al día (sync_cart_count); si no, una columna
+        count = self.request.session.get("cart_count")
+        if count is not None:
+            return count
+        cid = self.request.session.get("cart_id")
+        if not cid:
+            return 0
+        try:
+            return Cart.objects.filter(id=UUID(cid)).values_list("items_count", flat=True).first() or 0
+        except ValueError:
+            return 0
+
+    def product_ids(self):
+        if not self.cart.items_count:
+            return []
+        return list(self.cart.items.values_list("producto_id", flat=True))
+
+    def lines(self):
+        if not self.cart.items_count:
+            return []
+        return list(self.cart.items.values_list("producto_id", "cantidad"))
+
+    def add(self, product, qty=1):
+        self.request.cart = self._cart = materialize_cart(self.request)
+        add_product_to_cart(self._cart, product, qty)
+        sync_cart_count(self.request, self._cart)
+        return True
+
+    # Las mutaciones escriben con UPDATE/DELETE condicionales y aplican el delta
+    # solo si tocaron una fila: dos requests simultáneas sobre el mismo ítem
+    # (doble clic) no pueden descontar dos veces ni dejar una línea en 0.
+    def _line(self, item_id):
+        """QuerySet del ítem y su (cantidad, precio) leído con lock; None si no existe."""
+        items = CartItem.objects.filter(id=item_id, cart=self.cart)
+        return items, items.select_for_update().values_list("cantidad", "precio_unitario").first()
+
+    def increment(self, item_id):
+        with transaction.atomic():
+            items, line = self._line(item_id)
+            if line is None or not items.update(cantidad=F("cantidad") + 1):
+                return False
+            self.cart.apply_delta(amount=line[1])
+        return True
+
+    def decrement(self, item_id):
+        """Si la cantidad llega a 0, elimina el ítem."""
+        with transaction.atomic():
+            items, line = self._line(item_id)
+            if line is None:
+                return False
+            precio = line[1]
+            if items.filter(cantidad__gt=1).update(cantidad=F("cantidad") - 1):
+                self.cart.apply_delta(amount=-precio)
+            elif items.filter(cantidad__lte=1).delete()[0]:
+                self.cart.apply_delta(items=-1, amount=-precio)
+        sync_cart_count(self.request, self.cart)
+        return True
+
+    def remove(self, item_id):
+        with transaction.atomic():
+            items, line = self._line(item_id)
+            if line is None or not items.delete()[0]:
+                return False
+            cantidad, precio = line
+            self.cart.apply_delta(items=-1, amount=-cantidad * precio)
+        sync_cart_count(self.request, self.cart)
+        return True
+
+    def clear(self):
+        if not self.cart.is_virtual:
+            self.cart.clear()
+            sync_cart_count(self.request, self.cart)
+        return True
@@ -0,0 +1,67 @@
+"""
+Resumen del carrito para la página del carrito: una sola consulta de ítems
+(con producto e inventario) y todo lo demás —subtotales, total, número de
+líneas, disponibilidad por línea— calculado en Python sobre esas filas.
+"""
+from decimal import Decimal
+
+from .models import Cart
+
+
+class CartLine:
+    def __init__(self, item):
+        self.id = item.id
+        self.producto = item.producto
+        self.cantidad = item.cantidad
+        self.precio_unitario = item.precio_unitario
+        self.subtotal = item.precio_unitario * item.cantidad
+        inv = getattr(item.producto, "inventario", None)
+        # None: el producto no tiene inventario registrado (no se limita)
+        self.disponible = inv.disponible() if inv is not None else None
+
+    @property
+    def excede_stock(self):
+        return self.disponible is not None and self.cantidad > self.disponible
+
+    @classmethod
+    def find(cls, cart, item_id=None, product_id=None):
+        """Una sola línea (por ítem o por producto) sin armar el resumen entero; None si no está."""
+        if not (item_id or product_id) or not cart.items_count:
+            return None
+        if isinstance(cart, Cart):
+            lookup = {"id": item_id} if item_id else {"producto_id": product_id}
+            item = cart.items.select_related("producto__inventario").filter(**lookup).first()
+        else:
+            item = next(
+                (it for it in cart.items.all() if it.id == item_id or (product_id and it.producto_id == product_id)),
+                None,
+            )
+        return cls(item) if item is not None else None
+
+
+class CartSummary:
+    def __init__(self, cart, items):
+        self.cart = cart
+        self.lines = [CartLine(it) for it in items]
+        self.count = len(self.lines)
+        self.units = sum(line.cantidad for line in self.lines)
+        self.total = sum((line.subtotal for line in self.lines), Decimal("0"))
+
+    @classmethod
+    def for_cart(cls, cart):
+        """`cart` es un Cart de la BD o un carrito de cart.storage (cookie/caché)."""
+        if not cart.items_count:
+            return cls(cart, [])
+        if isinstance(cart, Cart):
+            items = cart.items.select_related("producto__inventario")
+        else:
+            items = cart.items.all()  # StoredCart ya carga producto + inventario en una consulta
+        return cls(cart, items)
+
+    @property
+    def product_ids(self):
+        return [line.producto.id for line in self.lines]
+
+    @property
+    def has_stock_issues(self):
+        return any(line.excede_stock for line in self.lines)
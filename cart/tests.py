@@ -1,3 +1,113 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Inventory, Product
+
+from .models import Cart, CartItem, CartStatus
+
+
+class MergeOnLoginBenchmark(TestCase):
+    """El costo del login no depende del tamaño del carrito de invitado (merge por conjuntos)."""
+
+    SIZES = [1, 20, 200]
+    PASSWORD = "clave-segura-123"
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Category.objects.create(nombre="Bench")
+        cls.products = Product.objects.bulk_create([
+            Product(categoria=categoria, nombre=f"Producto {i}", slug=f"producto-{i}", precio=Decimal("10.00"))
+            for i in range(max(cls.SIZES))
+        ])
+
+    def _login_with_guest_cart(self, n, email):
+        user = get_user_model().objects.create_user(email, self.PASSWORD)
+        # el usuario ya tiene un carrito con el primer producto: ese se suma, el resto se inserta
+        user_cart = Cart.objects.create(usuario=user)
+        CartItem.objects.create(cart=user_cart, producto=self.products[0], cantidad=1, precio_unitario=Decimal("10.00"))
+        user_cart.recalculate()
+
+        session = self.client.session
+        session.save()
+        guest = Cart.objects.create(session_key=session.session_key)
+        CartItem.objects.bulk_create([
+            CartItem(cart=guest, producto=p, cantidad=2, precio_unitario=p.precio) for p in self.products[:n]
+        ])
+        guest.recalculate()
+        session["cart_id"] = str(guest.id)
+        session.save()
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/accounts/login/", {"username": email, "password": self.PASSWORD})
+        elapsed = time.perf_counter() - start
+        self.assertEqual(response.status_code, 302)
+        self.client.logout()
+
+        user_cart.refresh_from_db()
+        guest.refresh_from_db()
+        self.assertEqual(user_cart.items_count, n)
+        self.assertEqual(user_cart.total, Decimal("10.00") * (2 * n + 1))
+        self.assertEqual(user_cart.items.get(producto=self.products[0]).cantidad, 3)
+        self.assertEqual((guest.estado, guest.items_count, guest.items.count()), (CartStatus.EXPIRADO, 0, 0))
+        return len(queries), elapsed
+
+    def test_login_query_count_is_flat(self):
+        results = {n: self._login_with_guest_cart(n, f"bench{n}@example.com") for n in self.SIZES}
+        report = ", ".join(f"{n} ítems: {q} consultas / {t * 1000:.1f} ms" for n, (q, t) in results.items())
+        counts = [q for q, _ in results.values()]
+        # en SQLite (máx. 999 parámetros por sentencia) el upsert de 200 líneas va en dos INSERT
+        self.assertLessEqual(max(counts) - min(counts), 1, f"el login escala con el carrito: {report}")
+
+
+class CartDetailQueriesTest(TestCase):
+    """La página del carrito hace las mismas consultas con 1 o con muchos ítems (sin N+1)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categoria = Category.objects.create(nombre="Resumen")
+        cls.products = Product.objects.bulk_create([
+            Product(categoria=categoria, nombre=f"Producto {i}", slug=f"resumen-{i}", precio=Decimal("5.00"))
+            for i in range(12)
+        ])
+        Inventory.objects.bulk_create([
+            Inventory(producto=p, sku=f"SKU-{i}", stock=2) for i, p in enumerate(cls.products)
+        ])
+
+    def _guest_cart(self, n):
+        session = self.client.session
+        session.save()
+        cart = Cart.objects.create(session_key=session.session_key)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, producto=p, cantidad=i + 1, precio_unitario=p.precio)
+            for i, p in enumerate(self.products[:n])
+        ])
+        cart.recalculate()
+        session["cart_id"] = str(cart.id)
+        session["cart_count"] = cart.items_count
+        session.save()
+        return cart
+
+    def test_detail_queries(self):
+        for n in (1, 12):
+            with self.subTest(items=n):
+                self.client.cookies.clear()
+                self._guest_cart(n)
+                # sesión + carrito + ítems (con producto e inventario) + recomendaciones
+                with self.assertNumQueries(4):
+                    response = self.client.get("/cart/")
+                summary = response.context["summary"]
+                self.assertEqual(summary.count, n)
+                self.assertEqual(summary.total, Decimal("5.00") * sum(range(1, n + 1)))
+                # stock=2: las líneas con cantidad 3 o más exceden lo disponible
+                self.assertEqual(sum(line.excede_stock for line in summary.lines), max(0, n - 2))
 
-# Create your tests here.
+    def test_empty_cart_does_not_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/cart/")
+        self.assertEqual(response.context["summary"].lines, [])
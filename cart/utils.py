@@ -5,6 +5,12 @@ from django.utils import timezone
 from datetime import timedelta
 from django.db import transaction
 from django.conf import settings 
+from core import metrics
+from django.core.exceptions import ValidationError
+
+AVOIDED = metrics.register("cart.lazy.avoided", "Requests que leyeron un carrito virtual y terminaron sin crear fila ni sesión")
+CREATED = metrics.register("cart.lazy.created", "Carritos creados al agregar el primer producto")
+
 
 def _ensure_session_key(request):
     if not request.session.session_key:
@@ -18,85 +24,146 @@ def _ensure_session_key(request):
     return request.session.session_key
 
 
+def _stale_cutoff():
+    return timezone.now() - timedelta(minutes=getattr(settings, "CART_TTL_MINUTES", 45))
+
+
 def _is_stale(cart) -> bool:
-    ttl = getattr(settings, "CART_TTL_MINUTES", 45)
-    return cart.updated_at < (timezone.now() - timedelta(minutes=ttl))
+    """
+    Vencido por inactividad. En el request solo se compara la fecha: un carrito
+    vencido se trata como expirado y se ignora; marcarlo EXPIRADO y borrar sus
+    ítems le toca al barrido en segundo plano (`expire_carts --loop`).
+    """
+    return cart.updated_at < _stale_cutoff()
 
 
-def get_or_create_active_cart(request):
+def get_or_create_active_cart(request, create=True):
     """
     - Invitado: carrito ligado a session_key (1 activo).
     - Logueado: carrito ligado a usuario (1 activo). Fusiona si hay uno de sesión.
+
+    Camino rápido: si la sesión apunta a un carrito abierto, vigente y del
+    usuario actual (o sin usuario, para invitados) basta una consulta. Solo
+    cuando algo no cuadra se hace la búsqueda completa (y la fusión).
+
+    Con create=False (lecturas) no se crea sesión ni fila: si no hay carrito se
+    devuelve uno virtual, vacío y sin guardar (`cart.is_virtual`). En las vistas
+    usar `request.cart` (cart.middleware), que resuelve una sola vez en modo
+    lectura, y `materialize_cart(request)` antes de agregar el primer producto.
     """
-    session_key = _ensure_session_key(request)
+    cart = _session_cart(request)
+    if cart is None:
+        cart = _resolve_cart(request, create)
+    if cart.is_virtual:
+        # no escribe en la sesión (eso la crearía); solo limpia referencias viejas
+        request.session.pop("cart_id", None)
+        request.session.pop("cart_count", None)
+        return cart
+    if request.session.get("cart_id") != str(cart.id):
+        request.session["cart_id"] = str(cart.id)
+    sync_cart_count(request, cart)
+    return cart
+
+
+def get_active_cart(request):
+    """El carrito activo o uno virtual: nunca crea filas ni sesiones."""
+    return get_or_create_active_cart(request, create=False)
+
+
+def materialize_cart(request):
+    """Garantiza que `request.cart` exista en la BD (primer "agregar")."""
+    if request.cart.is_virtual:
+        request.cart = get_or_create_active_cart(request, create=True)
+        metrics.incr(CREATED)
+    return request.cart
+
+
+def _session_cart(request):
+    cid = request.session.get("cart_id")
+    if not cid:
+        return None
+    try:
+        # el UUID se valida al armar el filtro, no al ejecutarlo
+        qs = Cart.objects.filter(id=cid, estado=CartStatus.ABIERTO)
+    except ValidationError:  # cart_id corrupto en la sesión
+        return None
+    if request.user.is_authenticated:
+        qs = qs.filter(usuario=request.user)
+    else:
+        qs = qs.filter(usuario__isnull=True)
+    cart = qs.first()
+    if cart is None or _is_stale(cart):
+        return None
+    return cart
+
+
+def _resolve_cart(request, create):
+    session_key = _ensure_session_key(request) if create else request.session.session_key
 
-    
     sess_cart = None
     cid = request.session.get("cart_id")
     if cid:
         try:
             c = Cart.objects.get(id=cid)
-            # válido solo si está ABIERTO
-            if c.estado == CartStatus.ABIERTO:
+            # válido solo si está ABIERTO y no es de otro usuario
+            if c.estado == CartStatus.ABIERTO and c.usuario_id in (None, request.user.pk) and not _is_stale(c):
                 sess_cart = c
-        except Cart.DoesNotExist:
+        except (Cart.DoesNotExist, ValidationError):
             pass
 
-    
-    if not sess_cart:
+    if not sess_cart and session_key:
         sess_cart = (
-            Cart.objects.filter(session_key=session_key, estado=CartStatus.ABIERTO)
+            Cart.objects.filter(session_key=session_key, estado=CartStatus.ABIERTO, updated_at__gte=_stale_cutoff())
             .order_by("-updated_at")
             .first()
         )
 
-    
-    if not sess_cart:
-        sess_cart = Cart.objects.create(session_key=session_key, estado=CartStatus.ABIERTO)
-        request.session["cart_id"] = str(sess_cart.id)
-
-    
-    if _is_stale(sess_cart):
-        sess_cart.items.all().delete()
-        sess_cart.expire()  
+    if not sess_cart and create:
         sess_cart = Cart.objects.create(session_key=session_key, estado=CartStatus.ABIERTO)
-        request.session["cart_id"] = str(sess_cart.id)
 
-   
     if request.user.is_authenticated:
-        user_cart = (
-            Cart.objects.filter(usuario=request.user, estado=CartStatus.ABIERTO)
-            .exclude(id=sess_cart.id)
-            .order_by("-updated_at")
-            .first()
-        )
+        user_cart = Cart.objects.filter(usuario=request.user, estado=CartStatus.ABIERTO, updated_at__gte=_stale_cutoff())
+        if sess_cart:
+            user_cart = user_cart.exclude(id=sess_cart.id)
+        user_cart = user_cart.order_by("-updated_at").first()
         if user_cart:
-            
-            with transaction.atomic():
-                sess_cart.merge_into(user_cart)  
-                sess_cart.expire()
-            request.session["cart_id"] = str(user_cart.id)
+            if sess_cart:
+                with transaction.atomic():
+                    sess_cart.merge_into(user_cart)
+                    sess_cart.expire()
             sess_cart = user_cart
-        else:
-            
-            if not sess_cart.usuario_id:
-                sess_cart.usuario = request.user
-                sess_cart.save(update_fields=["usuario"])
+        elif sess_cart and not sess_cart.usuario_id:
+            sess_cart.usuario = request.user
+            sess_cart.save(update_fields=["usuario"])
+
+    if sess_cart is None:
+        return Cart(
+            session_key=session_key or "",
+            usuario=request.user if request.user.is_authenticated else None,
+            estado=CartStatus.ABIERTO,
+        )
+    return sess_cart
 
-    
-    request.session["cart_id"] = str(sess_cart.id)
-    request.session.modified = True
 
-    return sess_cart
+def sync_cart_count(request, cart):
+    """Guarda en sesión el contador del header (lo lee cart.context_processors sin consultas)."""
+    if request.session.get("cart_count") != cart.items_count:
+        request.session["cart_count"] = cart.items_count
 
 
 def add_product_to_cart(cart: Cart, product: Product, qty: int = 1):
-    item, created = CartItem.objects.get_or_create(
-        cart=cart, producto=product,
-        defaults={"cantidad": qty, "precio_unitario": product.precio}
-    )
-    if not created:
+    with transaction.atomic():
+        item, created = CartItem.objects.select_for_update().get_or_create(
+            cart=cart, producto=product,
+            defaults={"cantidad": qty, "precio_unitario": product.precio}
+        )
+        if created:
+            cart.apply_delta(items=1, amount=product.precio * qty)
+            return item
+        # el ítem toma el precio actual: el total cambia en la diferencia de la línea completa
+        previous = item.subtotal
         item.cantidad += qty
-    item.precio_unitario = product.precio  
-    item.save()
+        item.precio_unitario = product.precio
+        item.save()
+        cart.apply_delta(amount=item.subtotal - previous)
     return item
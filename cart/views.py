@@ -1,29 +1,74 @@
+from django.contrib import messages
+from django.contrib.humanize.templatetags.humanize import intcomma
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.defaultfilters import floatformat
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
-from django.db.models import F
-from .utils import get_or_create_active_cart, add_product_to_cart
-from .models import CartStatus, CartItem
+from .models import CartStatus
+from .storage import CartFull
+from .summary import CartLine, CartSummary
 from catalog.models import Product
+from catalog.services import bought_together_for
 
+CLOSED_MESSAGE = "Tu carrito ya no se puede modificar."
+NOT_FOUND_MESSAGE = "Ítem no encontrado"
 
-def _ensure_open(cart, request):
-    if cart.estado != CartStatus.ABIERTO:
-        messages.warning(request, "Tu carrito ya no se puede modificar.")
-        return False
-    return True
 
-def add(request, product_id):
-    cart = get_or_create_active_cart(request)
-    if not _ensure_open(cart, request):
+def _is_open(cart):
+    return cart.estado == CartStatus.ABIERTO
+
+
+def _wants_json(request):
+    """Las acciones del carrito hechas con fetch (ver base.html) piden JSON en vez del redirect."""
+    return (
+        request.headers.get("x-requested-with") == "XMLHttpRequest"
+        or "application/json" in request.headers.get("accept", "")
+    )
+
+
+def _respond(request, line_id=None, product_id=None, error=None, status=200):
+    """
+    Sin JS: redirect al carrito, como siempre. Con JS: solo lo que cambió —la
+    línea (HTML parcial, o null si se eliminó), el total y el contador del header.
+    """
+    if not _wants_json(request):
+        if status == 404:
+            raise Http404(error)
+        if error:
+            messages.warning(request, error)
         return redirect("cart:detail")
 
+    storage = request.cart_storage
+    cart = storage.cart
+    # total y contador desnormalizados en el carrito; solo se lee la línea que cambió
+    line = CartLine.find(cart, item_id=line_id, product_id=product_id)
+    data = {
+        "ok": error is None,
+        "count": storage.count(),
+        "total": f"{cart.total:.2f}",
+        "total_display": f"$ {intcomma(floatformat(cart.total, 2))}",
+        "line_id": str(line.id if line else line_id or ""),
+        "line": None,
+    }
+    if error:
+        data["error"] = error
+    if line is not None:
+        data["line"] = {
+            "cantidad": line.cantidad,
+            "subtotal": str(line.subtotal),
+            "html": render_to_string("cart/_line.html", {"it": line, "cart": cart}, request=request),
+        }
+    return JsonResponse(data, status=status)
+
 
 def detail(request):
     """
     Muestra el carrito activo (por sesión o usuario).
     """
-    cart = get_or_create_active_cart(request)
-    return render(request, "cart/detail.html", {"cart": cart})
+    summary = CartSummary.for_cart(request.cart)
+    recommendations = bought_together_for(summary.product_ids) if summary.lines else []
+    return render(request, "cart/detail.html", {"summary": summary, "recommendations": recommendations})
 
 
 @require_POST
@@ -31,14 +76,17 @@ def add(request, product_id):
     """
     Agrega un producto al carrito (cantidad por defecto 1 o qty en POST).
     """
-    cart = get_or_create_active_cart(request)
-    if cart.estado != CartStatus.ABIERTO:
-        return redirect("cart:detail")
+    storage = request.cart_storage
+    if not _is_open(storage.cart):
+        return _respond(request, error=CLOSED_MESSAGE, status=409)
 
     product = get_object_or_404(Product, id=product_id, activo=True)
     qty = int(request.POST.get("qty", 1))
-    add_product_to_cart(cart, product, max(1, qty))
-    return redirect("cart:detail")
+    try:
+        storage.add(product, max(1, qty))
+    except CartFull as e:
+        return _respond(request, product_id=product.id, error=str(e), status=409)
+    return _respond(request, product_id=product.id)
 
 
 @require_POST
@@ -46,14 +94,16 @@ def increment(request, item_id):
     """
     Incrementa en +1 la cantidad de un ítem del carrito.
     """
-    cart = get_or_create_active_cart(request)
-    if cart.estado != CartStatus.ABIERTO:
-        return redirect("cart:detail")
+    storage = request.cart_storage
+    if not _is_open(storage.cart):
+        return _respond(request, line_id=item_id, error=CLOSED_MESSAGE, status=409)
 
-    item = get_object_or_404(CartItem, id=item_id, cart=cart)
-    item.cantidad = F("cantidad") + 1
-    item.save(update_fields=["cantidad"])
-    return redirect("cart:detail")
+    try:
+        if not storage.increment(item_id):
+            return _respond(request, line_id=item_id, error=NOT_FOUND_MESSAGE, status=404)
+    except CartFull as e:
+        return _respond(request, line_id=item_id, error=str(e), status=409)
+    return _respond(request, line_id=item_id)
 
 
 @require_POST
@@ -61,17 +111,13 @@ def decrement(request, item_id):
     """
     Decrementa en -1 la cantidad de un ítem del carrito. Si llega a 0, elimina el ítem.
     """
-    cart = get_or_create_active_cart(request)
-    if cart.estado != CartStatus.ABIERTO:
-        return redirect("cart:detail")
+    storage = request.cart_storage
+    if not _is_open(storage.cart):
+        return _respond(request, line_id=item_id, error=CLOSED_MESSAGE, status=409)
 
-    item = get_object_or_404(CartItem, id=item_id, cart=cart)
-    if item.cantidad <= 1:
-        item.delete()
-    else:
-        item.cantidad = F("cantidad") - 1
-        item.save(update_fields=["cantidad"])
-    return redirect("cart:detail")
+    if not storage.decrement(item_id):
+        return _respond(request, line_id=item_id, error=NOT_FOUND_MESSAGE, status=404)
+    return _respond(request, line_id=item_id)
 
 
 @require_POST
@@ -79,11 +125,8 @@ def remove(request, item_id):
     """
     Elimina un ítem del carrito.
     """
-    cart = get_or_create_active_cart(request)
-    it = cart.items.filter(id=item_id).first()
-    if it:
-        it.delete()
-    return redirect("cart:detail")
+    request.cart_storage.remove(item_id)
+    return _respond(request, line_id=item_id)
 
 
 @require_POST
@@ -91,6 +134,5 @@ def clear(request):
     """
     Vacía el carrito por completo.
     """
-    cart = get_or_create_active_cart(request)
-    cart.items.all().delete()
-    return redirect("cart:detail")
+    request.cart_storage.clear()
+    return _respond(request)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Product, Inventory
+from .models import Category, Product, Inventory, RelatedProduct
 
 class InventoryInline(admin.StackedInline):
     model = Inventory
@@ -8,7 +8,7 @@ class InventoryInline(admin.StackedInline):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("nombre", "slug")
+    list_display = ("nombre", "slug", "active_product_count")
     search_fields = ("nombre", "slug")
     prepopulated_fields = {"slug": ("nombre",)}
 
@@ -24,3 +24,10 @@ class ProductAdmin(admin.ModelAdmin):
 class InventoryAdmin(admin.ModelAdmin):
     list_display = ("sku", "producto", "stock", "reservado")
     search_fields = ("sku", "producto__nombre")
+
+@admin.register(RelatedProduct)
+class RelatedProductAdmin(admin.ModelAdmin):
+    list_display = ("producto", "relacionado", "tipo", "posicion", "score")
+    list_filter = ("tipo",)
+    search_fields = ("producto__nombre", "relacionado__nombre")
+    raw_id_fields = ("producto", "relacionado")
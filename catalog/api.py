@@ -0,0 +1,198 @@
+"""
+API JSON de solo lectura del catálogo (productos, categorías, disponibilidad).
+
+    GET /api/productos/?fields=id,nombre,precio&orden=precio_asc&cursor=...&limit=24
+        (acepta los mismos filtros que el listado: ?cat=<slug>&precio=<banda>&stock=1)
+    GET /api/productos/<slug>/?fields=...
+    GET /api/productos/export/?fields=...      (todos los activos, en streaming)
+    GET /api/categorias/
+    GET /api/autocompletar/?q=cam              (índice en memoria, ver autocomplete.py)
+
+Todo se serializa desde `values()`: no se instancian modelos. `fields=` limita
+las columnas que se piden a la BD (los listados no traen `descripcion` salvo que
+se pida). Las respuestas llevan ETag/Last-Modified según la versión del
+catálogo, así que un cliente que revalida recibe 304 sin consulta alguna.
+"""
+import hashlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET
+
+from .autocomplete import MAX_RESULTS, get_autocomplete_index
+from .facets import FacetFilters, get_facet_index
+from .models import Category, Product
+from .pagination import DEFAULT_SORT, SORTS, KeysetPaginator
+from .versioning import catalog_last_modified, get_catalog_version
+
+# campo público -> lookup para values()
+PRODUCT_FIELDS = {
+    "id": "id",
+    "slug": "slug",
+    "nombre": "nombre",
+    "descripcion": "descripcion",
+    "precio": "precio",
+    "imagen_url": "imagen_url",
+    "categoria": "categoria__slug",
+    "en_stock": "en_stock",
+    "disponible": "disponible",  # anotación: stock - reservado
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+LIST_FIELDS = ["id", "slug", "nombre", "precio", "imagen_url", "categoria", "en_stock"]
+DETAIL_FIELDS = list(PRODUCT_FIELDS)
+CATEGORY_FIELDS = {"id": "id", "slug": "slug", "nombre": "nombre", "descripcion": "descripcion",
+                   "productos": "active_product_count"}
+
+DEFAULT_LIMIT = 24
+MAX_LIMIT = 100
+EXPORT_CHUNK_SIZE = 2000
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _parse_fields(request, default):
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(default)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in PRODUCT_FIELDS]
+    if unknown:
+        raise BadRequest(f"Campos desconocidos: {', '.join(unknown)}. Válidos: {', '.join(PRODUCT_FIELDS)}")
+    return fields
+
+
+def _parse_limit(request):
+    try:
+        limit = int(request.GET.get("limit") or DEFAULT_LIMIT)
+    except ValueError:
+        raise BadRequest("limit debe ser un entero")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def product_values(queryset, fields, extra=()):
+    """
+    `queryset.values()` con solo las columnas de `fields` (+ `extra`, p.ej. las
+    del cursor). Devuelve (queryset, [(nombre público, clave en la fila)]).
+    """
+    if "disponible" in fields:
+        queryset = queryset.annotate(disponible=F("inventario__stock") - F("inventario__reservado"))
+    lookups = dict.fromkeys([PRODUCT_FIELDS[f] for f in fields] + list(extra))
+    return queryset.values(*lookups), [(f, PRODUCT_FIELDS[f]) for f in fields]
+
+
+def _row(row, columns):
+    return {name: row[lookup] for name, lookup in columns}
+
+
+def _catalog_etag(request, *args, **kwargs):
+    raw = f"{get_catalog_version()}|{request.get_full_path()}"
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    return catalog_last_modified()
+
+
+catalog_condition = condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+
+
+@require_GET
+@catalog_condition
+def product_list(request):
+    try:
+        fields = _parse_fields(request, LIST_FIELDS)
+        limit = _parse_limit(request)
+    except BadRequest as e:
+        return _error(str(e))
+
+    sort = request.GET.get("orden")
+    sort = sort if sort in SORTS else DEFAULT_SORT
+    filters = FacetFilters.from_querydict(request.GET, get_facet_index())
+    # el cursor necesita el campo de orden y el id aunque no se hayan pedido
+    queryset, columns = product_values(filters.apply(Product.objects.activos()), fields,
+                                       extra=["id", SORTS[sort][1]])
+    paginator = KeysetPaginator(queryset, limit, sort=sort)
+    page = paginator.get_page(request.GET.get("cursor"))
+
+    def link(cursor):
+        if cursor is None:
+            return None
+        params = request.GET.copy()
+        params["cursor"] = cursor
+        params["orden"] = sort
+        return f"{request.path}?{params.urlencode()}"
+
+    return JsonResponse({
+        "results": [_row(row, columns) for row in page.object_list],
+        "next": link(page.next_cursor),
+        "previous": link(page.prev_cursor),
+        "orden": sort,
+        "ordenes": list(SORTS),
+    })
+
+
+@require_GET
+@catalog_condition
+def product_detail(request, slug):
+    try:
+        fields = _parse_fields(request, DETAIL_FIELDS)
+    except BadRequest as e:
+        return _error(str(e))
+    queryset, columns = product_values(Product.objects.activos().filter(slug=slug), fields)
+    row = queryset.first()
+    if row is None:
+        return _error("Producto no encontrado", status=404)
+    return JsonResponse(_row(row, columns))
+
+
+@require_GET
+@catalog_condition
+def product_export(request):
+    """Todos los productos activos como un array JSON generado por partes (memoria constante)."""
+    try:
+        fields = _parse_fields(request, LIST_FIELDS)
+    except BadRequest as e:
+        return _error(str(e))
+    queryset, columns = product_values(Product.objects.activos().order_by("id"), fields)
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+    def stream():
+        yield "["
+        sep = ""
+        for row in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield sep + encoder.encode(_row(row, columns))
+            sep = ","
+        yield "]"
+
+    response = StreamingHttpResponse(stream(), content_type="application/json")
+    response["Content-Disposition"] = 'inline; filename="productos.json"'
+    return response
+
+
+@require_GET
+@catalog_condition
+def category_list(request):
+    rows = Category.objects.order_by("nombre").values(*CATEGORY_FIELDS.values())
+    columns = list(CATEGORY_FIELDS.items())
+    return JsonResponse({"results": [_row(row, columns) for row in rows]})
+
+
+@require_GET
+def autocomplete(request):
+    """Sugerencias mientras se escribe. Sin consultas: solo la versión del catálogo (caché) y el índice."""
+    query = request.GET.get("q", "")
+    try:
+        limit = int(request.GET.get("limit") or MAX_RESULTS)
+    except ValueError:
+        return _error("limit debe ser un entero")
+    response = JsonResponse({"q": query, "results": get_autocomplete_index().suggest(query, limit)})
+    response["Cache-Control"] = "public, max-age=60"
+    return response
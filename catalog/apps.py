@@ -5,4 +5,4 @@ class CatalogConfig(AppConfig):
     name = 'catalog'
 
     def ready(self):
-        from . import signals  
+        from . import signals, fragments  # noqa
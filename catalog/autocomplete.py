@@ -0,0 +1,171 @@
+"""
+Sugerencias de nombres de producto mientras se escribe (type-ahead).
+
+Índice de prefijos en memoria: un arreglo ordenado de claves normalizadas
+(minúsculas, sin tildes) —una por cada palabra del nombre, desde esa palabra
+hasta el final, para que "nike" encuentre "Camiseta Slim Nike"— y `bisect`
+para ubicar el rango que empieza con lo escrito. Los resultados se ordenan por
+popularidad (unidades vendidas) precalculada como un ranking entero.
+
+Los prefijos cortos (hasta SHORT_PREFIX_MAX letras) son los que más coinciden,
+así que su top-k se precalcula al construir el índice. Para los largos el rango
+puede seguir siendo grande ("nike" en un catálogo de marcas), así que el arreglo
+se parte en bloques de BLOCK_SIZE claves (y superbloques de BLOCK_SIZE²) con su
+top-k precalculado: una consulta lee como mucho dos bordes de bloque y los top-k
+de los bloques intermedios, no cada clave del rango.
+
+Como facets.py, cada proceso reconstruye el índice cuando cambia la versión del
+catálogo, pero construirlo tarda segundos con un catálogo grande: la primera vez
+se construye en la petición y después en un hilo aparte, mientras las consultas
+siguen usando el índice anterior. Buscar no toca la base de datos.
+"""
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from django.db import connection
+from django.db.models import Sum
+from django.urls import reverse
+
+from .models import Product
+from .versioning import get_catalog_version
+
+MIN_QUERY_LENGTH = 2
+MAX_RESULTS = 10
+SHORT_PREFIX_MAX = 3
+BLOCK_SIZE = 32
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """'Camiseta  Clásica-Ñandú' -> 'camiseta clasica nandu'"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+class AutocompleteIndex:
+    def __init__(self, version, products, popularity):
+        """
+        products: [(id, nombre, slug, precio)] de productos activos
+        popularity: {id: unidades vendidas}
+        """
+        self.version = version
+        # ranking 0..n-1: más vendido primero, luego nombre más corto, luego alfabético
+        ordered = sorted(products, key=lambda p: (-popularity.get(p[0], 0), len(p[1]), p[1]))
+        self.items = [(nombre, slug, precio) for _, nombre, slug, precio in ordered]
+        # reverse() una sola vez; por producto solo se sustituye el slug
+        self.url_template = reverse("catalog:product_detail", kwargs={"slug": "SLUG"}).replace("SLUG", "{}")
+
+        entries = []
+        for rank, (_, nombre, _, _) in enumerate(ordered):
+            words = normalize(nombre).split()
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), rank))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ranks = [rank for _, rank in entries]
+
+        short = {}
+        for key, rank in entries:
+            for n in range(MIN_QUERY_LENGTH, SHORT_PREFIX_MAX + 1):
+                if len(key) >= n:
+                    short.setdefault(key[:n], set()).add(rank)
+        self.short = {prefix: heapq.nsmallest(MAX_RESULTS, ranks) for prefix, ranks in short.items()}
+
+        # top-k de cada bloque de BLOCK_SIZE claves y de cada superbloque de BLOCK_SIZE bloques
+        self.blocks = [
+            heapq.nsmallest(MAX_RESULTS, set(self.ranks[i:i + BLOCK_SIZE]))
+            for i in range(0, len(self.ranks), BLOCK_SIZE)
+        ]
+        self.superblocks = [
+            heapq.nsmallest(MAX_RESULTS, {r for block in self.blocks[i:i + BLOCK_SIZE] for r in block})
+            for i in range(0, len(self.blocks), BLOCK_SIZE)
+        ]
+
+    @classmethod
+    def build(cls, version):
+        products = list(Product.objects.activos().values_list("id", "nombre", "slug", "precio"))
+        from orders.models import OrderItem
+
+        popularity = dict(
+            OrderItem.objects.values("producto_id")
+            .annotate(unidades=Sum("cantidad"))
+            .values_list("producto_id", "unidades")
+        )
+        return cls(version, products, popularity)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _candidates(self, lo, hi):
+        """
+        Ranks que pueden estar en el top-k del rango [lo, hi): las claves sueltas de
+        los bordes más el top-k de cada bloque (o superbloque) que cae entero dentro.
+        """
+        first, last = -(-lo // BLOCK_SIZE), hi // BLOCK_SIZE  # bloques completos [first, last)
+        if first >= last:
+            return set(self.ranks[lo:hi])
+        found = set(self.ranks[lo:first * BLOCK_SIZE])
+        found.update(self.ranks[last * BLOCK_SIZE:hi])
+        sfirst, slast = -(-first // BLOCK_SIZE), last // BLOCK_SIZE
+        if sfirst >= slast:
+            blocks = self.blocks[first:last]
+        else:
+            blocks = self.blocks[first:sfirst * BLOCK_SIZE] + self.blocks[slast * BLOCK_SIZE:last]
+            blocks += self.superblocks[sfirst:slast]
+        for block in blocks:
+            found.update(block)
+        return found
+
+    def suggest(self, query, limit=MAX_RESULTS):
+        """Hasta `limit` productos cuyo nombre tiene una palabra que empieza con `query`."""
+        prefix = normalize(query)
+        limit = max(1, min(limit, MAX_RESULTS))
+        if len(prefix) < MIN_QUERY_LENGTH:
+            return []
+        if len(prefix) <= SHORT_PREFIX_MAX:
+            ranks = self.short.get(prefix, [])[:limit]
+        else:
+            # el rango [lo, hi) de claves que empiezan con el prefijo
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + "\uffff", lo)
+            ranks = heapq.nsmallest(limit, self._candidates(lo, hi))
+        return [
+            {"nombre": nombre, "precio": str(precio), "url": self.url_template.format(slug)}
+            for nombre, slug, precio in (self.items[r] for r in ranks)
+        ]
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _rebuild(version):
+    global _index
+    try:
+        _index = AutocompleteIndex.build(version)
+    finally:
+        connection.close()  # la conexión es de este hilo; nadie más la cierra
+        _lock.release()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """
+    El índice vigente. Si la versión cambió, lo reconstruye un hilo en segundo
+    plano (uno a la vez) y mientras tanto se sirve el anterior.
+    """
+    global _index
+    version = get_catalog_version()
+    index = _index
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = AutocompleteIndex.build(version)
+            return _index
+    if index.version != version and _lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild, args=(version,), daemon=True).start()
+    return index
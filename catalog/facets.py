@@ -0,0 +1,176 @@
+"""
+Filtros facetados (categoría, rango de precio, en stock) con conteos.
+
+Los conteos salen de un índice columnar en memoria: una fila por producto
+activo y, por cada valor de faceta, un bitmap (int de Python) con las filas
+que lo tienen. Contar "cuántos productos de la categoría X cumplen los demás
+filtros" es un AND de bitmaps + `int.bit_count()`, sin tocar la base de datos.
+
+El índice se reconstruye perezosamente en cada proceso cuando cambia la
+versión del catálogo (ver versioning.py).
+"""
+import threading
+from decimal import Decimal
+
+from django.db.models import Q
+
+from .models import Category, Product
+from .versioning import get_catalog_version
+
+
+# clave -> (etiqueta, mínimo incluido, máximo excluido)
+PRICE_BANDS = {
+    "0-50": ("Hasta $50", None, Decimal("50")),
+    "50-100": ("$50 a $100", Decimal("50"), Decimal("100")),
+    "100-200": ("$100 a $200", Decimal("100"), Decimal("200")),
+    "200+": ("Más de $200", Decimal("200"), None),
+}
+
+
+def price_band(precio):
+    for key, (_, lo, hi) in PRICE_BANDS.items():
+        if (lo is None or precio >= lo) and (hi is None or precio < hi):
+            return key
+    return None
+
+
+class _Bits:
+    """Acumula un bitmap en un bytearray (O(n)) y lo convierte a int al final."""
+
+    def __init__(self, size):
+        self.buf = bytearray((size + 7) // 8)
+
+    def set(self, i):
+        self.buf[i >> 3] |= 1 << (i & 7)
+
+    def to_int(self):
+        return int.from_bytes(self.buf, "little")
+
+
+class FacetIndex:
+    def __init__(self, version, categories, rows):
+        """
+        categories: [(id, slug, nombre)]
+        rows: [(categoria_id, precio, en_stock)] de productos activos
+        """
+        self.version = version
+        self.categories = categories
+        self.category_by_slug = {slug: cid for cid, slug, _ in categories}
+        size = len(rows)
+        self.size = size
+        self.all = (1 << size) - 1
+
+        by_cat = {cid: _Bits(size) for cid, _, _ in categories}
+        by_band = {key: _Bits(size) for key in PRICE_BANDS}
+        stock = _Bits(size)
+        for i, (cid, precio, en_stock) in enumerate(rows):
+            if cid in by_cat:
+                by_cat[cid].set(i)
+            band = price_band(precio)
+            if band:
+                by_band[band].set(i)
+            if en_stock:
+                stock.set(i)
+
+        self.by_category = {cid: bits.to_int() for cid, bits in by_cat.items()}
+        self.by_band = {key: bits.to_int() for key, bits in by_band.items()}
+        self.in_stock = stock.to_int()
+
+    @classmethod
+    def build(cls, version):
+        categories = list(Category.objects.order_by("nombre").values_list("id", "slug", "nombre"))
+        rows = list(Product.objects.activos().values_list("categoria_id", "precio", "en_stock"))
+        return cls(version, categories, rows)
+
+    # ————— Conteos —————
+    def _mask(self, filters, skip=None):
+        mask = self.all
+        if filters.categorias and skip != "categoria":
+            m = 0
+            for cid in filters.categorias:
+                m |= self.by_category.get(cid, 0)
+            mask &= m
+        if filters.bandas and skip != "precio":
+            m = 0
+            for key in filters.bandas:
+                m |= self.by_band.get(key, 0)
+            mask &= m
+        if filters.en_stock and skip != "stock":
+            mask &= self.in_stock
+        return mask
+
+    def facets(self, filters):
+        """
+        Conteos por opción. Cada grupo se cuenta aplicando los filtros de los
+        *otros* grupos, para que marcar una categoría no ponga a 0 las demás.
+        """
+        cat_mask = self._mask(filters, skip="categoria")
+        band_mask = self._mask(filters, skip="precio")
+        stock_mask = self._mask(filters, skip="stock")
+        return {
+            "categorias": [
+                {"value": slug, "label": nombre, "selected": cid in filters.categorias,
+                 "count": (cat_mask & self.by_category.get(cid, 0)).bit_count()}
+                for cid, slug, nombre in self.categories
+            ],
+            "precios": [
+                {"value": key, "label": label, "selected": key in filters.bandas,
+                 "count": (band_mask & self.by_band[key]).bit_count()}
+                for key, (label, _, _) in PRICE_BANDS.items()
+            ],
+            "en_stock": {"selected": filters.en_stock, "count": (stock_mask & self.in_stock).bit_count()},
+            "total": self._mask(filters).bit_count(),
+        }
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_facet_index() -> FacetIndex:
+    global _index
+    version = get_catalog_version()
+    index = _index
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = FacetIndex.build(version)
+            index = _index
+    return index
+
+
+class FacetFilters:
+    """Filtros activos leídos de la querystring: ?cat=<slug>&precio=<banda>&stock=1"""
+
+    def __init__(self, categorias=(), bandas=(), en_stock=False):
+        self.categorias = set(categorias)
+        self.bandas = set(bandas)
+        self.en_stock = en_stock
+
+    @classmethod
+    def from_querydict(cls, params, index: FacetIndex):
+        cats = [index.category_by_slug[s] for s in params.getlist("cat") if s in index.category_by_slug]
+        bands = [b for b in params.getlist("precio") if b in PRICE_BANDS]
+        return cls(cats, bands, params.get("stock") == "1")
+
+    def __bool__(self):
+        return bool(self.categorias or self.bandas or self.en_stock)
+
+    def apply(self, queryset):
+        """Aplica los filtros a un ProductQuerySet (se espera ya filtrado por activos())."""
+        if self.categorias:
+            queryset = queryset.filter(categoria_id__in=self.categorias)
+        if self.bandas:
+            cond = Q()
+            for key in self.bandas:
+                _, lo, hi = PRICE_BANDS[key]
+                band = Q()
+                if lo is not None:
+                    band &= Q(precio__gte=lo)
+                if hi is not None:
+                    band &= Q(precio__lt=hi)
+                cond |= band
+            queryset = queryset.filter(cond)
+        if self.en_stock:
+            queryset = queryset.disponibles()
+        return queryset
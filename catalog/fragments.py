@@ -0,0 +1,52 @@
+"""
+Caché de fragmentos HTML del catálogo (grillas de productos).
+
+La clave incluye la versión del catálogo (versioning.py), así que cualquier
+cambio en Product/Inventory/Category invalida todos los fragmentos de golpe sin
+borrar nada: las claves viejas simplemente dejan de pedirse y expiran.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import metrics
+
+from .versioning import get_catalog_version
+
+HITS = metrics.register("catalog.fragment.hit", "Fragmentos del catálogo servidos desde caché")
+MISSES = metrics.register("catalog.fragment.miss", "Fragmentos del catálogo renderizados")
+
+# Los fragmentos se guardan con este marcador en lugar del token CSRF y se
+# sustituye por el token de cada request al servirlos.
+CSRF_PLACEHOLDER = "__glowbox_csrf_token__"
+
+
+def fragment_timeout():
+    return getattr(settings, "CATALOG_FRAGMENT_TIMEOUT", 60 * 60)
+
+
+def fragment_key(name, request, *vary_on):
+    """Clave = nombre + versión del catálogo + ruta + parámetros GET (ordenados)."""
+    parts = [request.path] if request is not None else []
+    if request is not None:
+        parts += [f"{k}={v}" for k, values in sorted(request.GET.lists()) for v in values]
+    parts += [str(v) for v in vary_on]
+    digest = hashlib.md5("&".join(parts).encode(), usedforsecurity=False).hexdigest()
+    return f"catalog:fragment:{name}:{get_catalog_version()}:{digest}"
+
+
+def get_fragment(key):
+    html = cache.get(key)
+    metrics.incr(HITS if html is not None else MISSES)
+    return html
+
+
+def set_fragment(key, html):
+    cache.set(key, html, fragment_timeout())
+
+
+def stats():
+    hits, misses = metrics.get(HITS), metrics.get(MISSES)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": (hits / total) if total else 0.0}
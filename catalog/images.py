@@ -0,0 +1,176 @@
+"""
+Miniaturas e imágenes responsivas para Product.imagen_url.
+
+La imagen original se descarga (o se lee de disco) una sola vez y se generan
+variantes redimensionadas en WebP y JPEG bajo MEDIA_ROOT:
+
+    productos/<hash[:2]>/<hash>-<variante>-<ancho>.<ext>
+
+El nombre lleva el hash del contenido original, así que una URL servida nunca
+cambia de contenido (se puede cachear "para siempre") y dos productos con la
+misma foto comparten archivos. El resultado queda en Product.imagenes:
+
+    {"src": <imagen_url procesada>, "hash": ..., "w": ..., "h": ...,
+     "variantes": {"card": {"webp": [[240, "productos/.."], ...], "jpeg": [...]}, ...}}
+
+Si `imagen_url` cambia después, `src` deja de coincidir y el template tag vuelve
+a usar la URL original hasta que se reprocese (ver build_thumbnails).
+
+Pillow es opcional: sin él la web sigue funcionando con las URLs originales;
+solo el procesamiento lo requiere.
+"""
+import hashlib
+import io
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .versioning import bump_on_commit, bump_versions_on_commit, object_version_key
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depende del entorno
+    Image = ImageOps = None
+
+
+# variante -> (anchos a generar, alto/ancho para recorte o None para conservar proporción)
+VARIANTS = {
+    "card": ((240, 480, 720), 0.75),     # .product-card img: 100% x 180px, object-fit: cover
+    "detail": ((600, 900, 1200), None),
+    "thumb": ((96, 192), 1.0),           # carrito: 96x96
+}
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+UPLOAD_DIR = "productos"
+FETCH_TIMEOUT = 15
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+
+
+class ImageProcessingError(Exception):
+    pass
+
+
+def pillow_available():
+    return Image is not None
+
+
+def read_source(source):
+    """
+    Devuelve los bytes de la imagen original. `source` puede ser bytes, una ruta
+    local, una URL file:// o una URL http(s).
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source = str(source)
+    parsed = urlparse(source)
+    if parsed.scheme in ("http", "https"):
+        req = urllib.request.Request(source, headers={"User-Agent": "glowbox-thumbnails/1.0"})
+        try:
+            with urllib.request.urlopen(req, timeout=FETCH_TIMEOUT) as resp:
+                data = resp.read(MAX_SOURCE_BYTES + 1)
+        except OSError as e:
+            raise ImageProcessingError(f"No se pudo descargar {source}: {e}") from e
+        if len(data) > MAX_SOURCE_BYTES:
+            raise ImageProcessingError(f"{source} supera {MAX_SOURCE_BYTES} bytes")
+        return data
+    path = Path(parsed.path if parsed.scheme == "file" else source)
+    try:
+        return path.read_bytes()
+    except OSError as e:
+        raise ImageProcessingError(f"No se pudo leer {path}: {e}") from e
+
+
+def _resize(img, width, ratio):
+    if ratio is None:
+        height = round(img.height * width / img.width)
+        return img.resize((width, height), Image.LANCZOS)
+    # recorte centrado a la proporción de la variante (como object-fit: cover)
+    return ImageOps.fit(img, (width, round(width * ratio)), Image.LANCZOS)
+
+
+def _encode(img, fmt):
+    pil_format, options = FORMATS[fmt]
+    buf = io.BytesIO()
+    img.save(buf, pil_format, **options)
+    return buf.getvalue()
+
+
+def _save(name, data):
+    # nombres por contenido: si ya existe es idéntico, no se reescribe
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+    return name
+
+
+def build_variants(data):
+    """Genera y guarda todas las variantes de `data`. Devuelve el dict para Product.imagenes (sin `src`)."""
+    if not pillow_available():
+        raise ImageProcessingError("Procesar imágenes requiere Pillow (pip install Pillow).")
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    try:
+        img = Image.open(io.BytesIO(data))
+        img = ImageOps.exif_transpose(img).convert("RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Imagen inválida: {e}") from e
+
+    variants = {}
+    for variant, (widths, ratio) in VARIANTS.items():
+        # no se amplía: los anchos mayores que el original se descartan (se deja al menos uno)
+        usable = [w for w in widths if w <= img.width] or [min(widths[0], img.width)]
+        variants[variant] = {fmt: [] for fmt in FORMATS}
+        for width in usable:
+            resized = _resize(img, width, ratio)
+            for fmt in FORMATS:
+                ext = "jpg" if fmt == "jpeg" else fmt
+                name = f"{UPLOAD_DIR}/{digest[:2]}/{digest}-{variant}-{width}.{ext}"
+                variants[variant][fmt].append([width, _save(name, _encode(resized, fmt))])
+    return {"hash": digest, "w": img.width, "h": img.height, "variantes": variants}
+
+
+def is_current(product):
+    """True si las variantes guardadas corresponden a la imagen_url actual."""
+    info = product.imagenes or {}
+    return bool(info.get("variantes")) and info.get("src") == product.imagen_url
+
+
+def process_product_image(product, source=None, force=False):
+    """
+    Genera las variantes de un producto a partir de `source` (bytes, ruta o URL;
+    por defecto su imagen_url). Devuelve False si ya estaban al día.
+    """
+    if not force and source is None and is_current(product):
+        return False
+    source = source if source is not None else product.imagen_url
+    if not source:
+        return False
+    info = build_variants(read_source(source))
+    product.imagenes = store_variants(type(product).objects.filter(pk=product.pk), product.imagen_url, info)
+    return True
+
+
+def store_variants(queryset, src, info):
+    """Guarda `info` (de build_variants) como variantes de `src` en todos los productos de `queryset`."""
+    imagenes = {"src": src, **info}
+    # update directo: no pasa por save() (contadores) y no toca updated_at
+    with transaction.atomic():
+        ids = list(queryset.values_list("pk", flat=True))
+        queryset.update(imagenes=imagenes)
+        bump_on_commit()
+        bump_versions_on_commit(object_version_key("product", pk) for pk in ids)
+    return imagenes
+
+
+def variant_urls(product, variant):
+    """{formato: [(ancho, url), ...]} de la variante, o None si no hay variantes vigentes."""
+    if not is_current(product):
+        return None
+    by_format = product.imagenes["variantes"].get(variant)
+    if not by_format:
+        return None
+    return {
+        fmt: [(width, default_storage.url(name)) for width, name in entries]
+        for fmt, entries in by_format.items()
+    }
@@ -0,0 +1,202 @@
+# catalog/management/commands/build_bought_together.py
+"""
+"Comprados juntos": co-ocurrencia de productos en pedidos pagados.
+
+1. Cuenta, por cada par de productos, en cuántos pedidos pagados aparecen
+   juntos (matriz dispersa C = XᵀX, con X pedidos × productos) y lo acumula en
+   CoPurchase. La diagonal C[i][i] es el número de pedidos con el producto i.
+2. Normaliza (coseno: C[i][j] / √(C[i][i]·C[j][j]), o lift: C[i][j]·N / (C[i][i]·C[j][j]))
+   y guarda los N mejores vecinos de cada producto en RelatedProduct(COMPRADOS_JUNTOS),
+   que el detalle y el carrito leen con una consulta indexada.
+
+Uso:
+  python manage.py build_bought_together                 # incremental: pedidos nuevos desde la última corrida
+  python manage.py build_bought_together --full          # recalcula todo desde cero
+  python manage.py build_bought_together --metric lift --limit 6 --min-count 2
+
+La marca de la incremental es un corte sobre Order.paid_at: cada corrida cuenta
+los pedidos pagados en (corte anterior, ahora − --lag]. El margen cubre los pagos
+cuya transacción todavía no había hecho commit cuando corrió la anterior; sin él,
+un pedido pagado antes del corte pero visible después quedaría fuera para siempre.
+"""
+import math
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import combinations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from catalog.models import CoPurchase, CoPurchaseRun, Product, RelatedKind, RelatedProduct
+from catalog.versioning import RELATIONS_VERSION_KEY, bump_on_commit, bump_versions_on_commit
+from orders.models import Order, OrderItem, OrderStatus
+
+PAID_STATUSES = [OrderStatus.PAGADA, OrderStatus.ENVIADA, OrderStatus.ENTREGADA]
+
+
+def _chunked(seq, size):
+    seq = list(seq)
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def count_pairs(rows):
+    """
+    rows: (orden_id, producto_id) ordenado por orden. Devuelve (Counter{(a, b): veces}
+    con a <= b, pedidos contados). Cada pedido cuenta una vez por par aunque repita producto.
+    """
+    counts = Counter()
+    orders = 0
+    current, basket = None, set()
+
+    def flush():
+        items = sorted(basket)
+        counts.update((p, p) for p in items)
+        counts.update(combinations(items, 2))
+
+    for orden_id, producto_id in rows:
+        if orden_id != current:
+            if basket:
+                flush()
+                orders += 1
+            current, basket = orden_id, set()
+        basket.add(producto_id)
+    if basket:
+        flush()
+        orders += 1
+    return counts, orders
+
+
+class Command(BaseCommand):
+    help = "Calcula 'comprados juntos' a partir de la co-ocurrencia en pedidos pagados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Descarta los conteos y recalcula desde cero.")
+        parser.add_argument("--metric", choices=["cosine", "lift"], default="cosine")
+        parser.add_argument("--limit", type=int, default=8, help="Vecinos por producto (default 8).")
+        parser.add_argument("--min-count", type=int, default=1,
+                            help="Pedidos en común mínimos para considerar un par (default 1).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--lag", type=int, default=300,
+                            help="Segundos que se dejan fuera al final de la ventana (default 300).")
+
+    def handle(self, *args, **opts):
+        start = time.monotonic()
+        self.batch_size = opts["batch_size"]
+        last = None if opts["full"] else CoPurchaseRun.objects.exclude(hasta=None).first()
+
+        hasta = timezone.now() - timedelta(seconds=opts["lag"])
+        orders = Order.objects.filter(status__in=PAID_STATUSES, paid_at__lte=hasta)
+        if last is not None:
+            orders = orders.filter(paid_at__gt=last.hasta)
+        if not opts["full"] and not orders.exists():
+            self.stdout.write("Sin pedidos nuevos desde la última corrida.")
+            return
+
+        rows = (
+            OrderItem.objects.filter(orden__in=orders)
+            .order_by("orden_id")
+            .values_list("orden_id", "producto_id")
+            .iterator(chunk_size=5000)
+        )
+        counts, n_orders = count_pairs(rows)
+
+        with transaction.atomic():
+            if opts["full"]:
+                CoPurchase.objects.all().delete()
+                RelatedProduct.objects.filter(tipo=RelatedKind.COMPRADOS_JUNTOS).delete()
+            self._accumulate(counts)
+            touched = {p for pair in counts for p in pair}
+            total_orders = n_orders + (0 if opts["full"] else self._orders_counted())
+            relations = self._rebuild_neighbours(touched, total_orders, opts)
+            CoPurchaseRun.objects.create(hasta=hasta, pedidos=n_orders, pares=len(counts), completo=opts["full"])
+            bump_on_commit()
+            bump_versions_on_commit([RELATIONS_VERSION_KEY])
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {n_orders} pedidos, {len(counts)} pares actualizados, {len(touched)} productos, "
+            f"{relations} relaciones en {elapsed:.1f}s."
+        ))
+
+    @staticmethod
+    def _orders_counted():
+        """Pedidos que ya suman en CoPurchase: los de la última --full y las incrementales posteriores."""
+        runs = CoPurchaseRun.objects.all()
+        base = runs.filter(completo=True).values_list("created_at", flat=True).first()
+        if base is not None:
+            runs = runs.filter(created_at__gte=base)
+        return runs.aggregate(n=Sum("pedidos"))["n"] or 0
+
+    def _accumulate(self, counts):
+        """Suma `counts` a CoPurchase: lee los pares existentes por lotes y hace upsert."""
+        pairs = list(counts)
+        for chunk in _chunked(pairs, self.batch_size):
+            cond = Q()
+            for a in {a for a, _ in chunk}:
+                cond |= Q(producto_a_id=a, producto_b_id__in=[b for x, b in chunk if x == a])
+            existing = dict(
+                ((a, b), veces)
+                for a, b, veces in CoPurchase.objects.filter(cond).values_list("producto_a_id", "producto_b_id", "veces")
+            )
+            CoPurchase.objects.bulk_create(
+                [CoPurchase(producto_a_id=a, producto_b_id=b, veces=counts[a, b] + existing.get((a, b), 0))
+                 for a, b in chunk],
+                update_conflicts=True, unique_fields=["producto_a", "producto_b"], update_fields=["veces"],
+            )
+
+    def _pairs_touching(self, ids):
+        for chunk in _chunked(ids, 500):
+            yield from CoPurchase.objects.filter(
+                Q(producto_a_id__in=chunk) | Q(producto_b_id__in=chunk)
+            ).values_list("producto_a_id", "producto_b_id", "veces")
+
+    def _rebuild_neighbours(self, touched, total_orders, opts):
+        """
+        Recalcula el top-N de los productos afectados: los de los pedidos nuevos y
+        sus compañeros (su score depende de C[j][j] de los nuevos, que cambió).
+        """
+        affected = set(touched)
+        for a, b, _ in self._pairs_touching(touched):
+            affected.update((a, b))
+
+        diag, neighbours = {}, {}
+        for a, b, veces in self._pairs_touching(affected):
+            if a == b:
+                diag[a] = veces
+            elif veces >= opts["min_count"]:
+                neighbours.setdefault(a, {})[b] = veces
+                neighbours.setdefault(b, {})[a] = veces
+        missing = {j for i in affected for j in neighbours.get(i, {})} - diag.keys()
+        for chunk in _chunked(missing, 500):
+            diag.update(CoPurchase.objects.filter(producto_a_id__in=chunk, producto_b_id=F("producto_a_id"))
+                        .values_list("producto_a_id", "veces"))
+
+        candidates = {j for i in affected for j in neighbours.get(i, {})}
+        active = set()
+        for chunk in _chunked(candidates, 500):
+            active.update(Product.objects.activos().filter(pk__in=chunk).values_list("pk", flat=True))
+
+        def score(i, j, together):
+            if opts["metric"] == "lift":
+                return together * total_orders / (diag[i] * diag[j])
+            return together / math.sqrt(diag[i] * diag[j])
+
+        batch = []
+        for i in affected:
+            ranked = sorted(
+                ((score(i, j, c), j) for j, c in neighbours.get(i, {}).items() if j in active),
+                key=lambda t: (-t[0], str(t[1])),
+            )[: opts["limit"]]
+            batch += [
+                RelatedProduct(producto_id=i, relacionado_id=j, tipo=RelatedKind.COMPRADOS_JUNTOS,
+                               posicion=pos, score=s)
+                for pos, (s, j) in enumerate(ranked)
+            ]
+        for chunk in _chunked(affected, 500):
+            RelatedProduct.objects.filter(tipo=RelatedKind.COMPRADOS_JUNTOS, producto_id__in=chunk).delete()
+        RelatedProduct.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
@@ -0,0 +1,78 @@
+# catalog/management/commands/build_related_products.py
+"""
+Precalcula los "productos relacionados" de cada producto activo: los más
+cercanos en precio dentro de la misma categoría.
+
+Uso:
+  python manage.py build_related_products
+  python manage.py build_related_products --limit 6
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog.models import Product, RelatedKind, RelatedProduct
+from catalog.versioning import RELATIONS_VERSION_KEY, bump_on_commit, bump_versions_on_commit
+
+
+def _nearest_by_price(rows, i, limit):
+    """Vecinos de rows[i] por precio (rows ordenado por precio), alternando izq/der."""
+    out = []
+    lo, hi = i - 1, i + 1
+    price = rows[i][1]
+    while len(out) < limit and (lo >= 0 or hi < len(rows)):
+        take_lo = hi >= len(rows) or (lo >= 0 and price - rows[lo][1] <= rows[hi][1] - price)
+        if take_lo:
+            out.append(rows[lo])
+            lo -= 1
+        else:
+            out.append(rows[hi])
+            hi += 1
+    return out
+
+
+class Command(BaseCommand):
+    help = "Recalcula la tabla de productos relacionados (similares por categoría y precio)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=8, help="Relacionados por producto (default 8).")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        limit = opts["limit"]
+        batch_size = opts["batch_size"]
+        start = time.monotonic()
+
+        by_cat = {}
+        for pid, cat_id, precio in (
+            Product.objects.activos().order_by("categoria_id", "precio", "id")
+            .values_list("id", "categoria_id", "precio")
+            .iterator(chunk_size=5000)
+        ):
+            by_cat.setdefault(cat_id, []).append((pid, precio))
+
+        total = 0
+        with transaction.atomic():
+            RelatedProduct.objects.filter(tipo=RelatedKind.SIMILAR).delete()
+            batch = []
+            for rows in by_cat.values():
+                for i, (pid, precio) in enumerate(rows):
+                    for pos, (rid, rprecio) in enumerate(_nearest_by_price(rows, i, limit)):
+                        batch.append(RelatedProduct(
+                            producto_id=pid, relacionado_id=rid, tipo=RelatedKind.SIMILAR,
+                            posicion=pos, score=1.0 / (1.0 + float(abs(precio - rprecio))),
+                        ))
+                    if len(batch) >= batch_size:
+                        RelatedProduct.objects.bulk_create(batch)
+                        total += len(batch)
+                        batch = []
+            if batch:
+                RelatedProduct.objects.bulk_create(batch)
+                total += len(batch)
+            # el detalle cachea los relacionados: invalidarlo
+            bump_on_commit()
+            bump_versions_on_commit([RELATIONS_VERSION_KEY])
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(f"✓ {total} relaciones generadas en {elapsed:.1f}s."))
@@ -0,0 +1,82 @@
+# catalog/management/commands/build_thumbnails.py
+"""
+Genera las variantes redimensionadas (card, detail, thumb) de las imágenes de
+producto. Ver catalog/images.py.
+
+Uso:
+  python manage.py build_thumbnails                      # pendientes (imagen_url nueva o cambiada)
+  python manage.py build_thumbnails --force              # todas
+  python manage.py build_thumbnails --source-dir fotos/  # offline: fotos/<slug>.(jpg|png|webp)
+
+Cada URL distinta se descarga y procesa una sola vez aunque la compartan
+varios productos.
+"""
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import images
+from catalog.models import Product
+
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+class Command(BaseCommand):
+    help = "Genera miniaturas WebP/JPEG de las imágenes de producto bajo MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Reprocesa aunque ya estén al día.")
+        parser.add_argument("--source-dir",
+                            help="Lee las originales de <dir>/<slug>.<ext> en vez de descargar imagen_url.")
+        parser.add_argument("--limit", type=int, help="Procesa como máximo N productos.")
+
+    def handle(self, *args, **opts):
+        if not images.pillow_available():
+            raise CommandError("build_thumbnails requiere Pillow (pip install Pillow).")
+        source_dir = Path(opts["source_dir"]) if opts["source_dir"] else None
+        if source_dir and not source_dir.is_dir():
+            raise CommandError(f"No existe el directorio {source_dir}")
+
+        qs = Product.objects.only("id", "slug", "imagen_url", "imagenes").order_by("created_at", "id")
+        if not source_dir:
+            qs = qs.exclude(imagen_url="")
+
+        # agrupa por origen para procesar cada imagen una sola vez
+        groups, pending = {}, 0
+        for product in qs.iterator(chunk_size=1000):
+            if not opts["force"] and images.is_current(product):
+                continue
+            source = self._local_source(source_dir, product) if source_dir else product.imagen_url
+            if source is None:
+                continue
+            groups.setdefault(source, []).append(product)
+            pending += 1
+            if opts["limit"] and pending >= opts["limit"]:
+                break
+
+        done = failed = 0
+        for source, products in groups.items():
+            try:
+                info = images.build_variants(images.read_source(source))
+            except images.ImageProcessingError as e:
+                failed += len(products)
+                self.stderr.write(f"  {source}: {e}")
+                continue
+            # se agrupa también por imagen_url: es lo que `src` debe reflejar
+            by_src = {}
+            for p in products:
+                by_src.setdefault(p.imagen_url, []).append(p.pk)
+            for src, pks in by_src.items():
+                images.store_variants(Product.objects.filter(pk__in=pks), src, info)
+            done += len(products)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {done} producto(s) procesados desde {len(groups)} imagen(es) original(es); {failed} con error."
+        ))
+
+    def _local_source(self, source_dir, product):
+        for ext in SOURCE_EXTENSIONS:
+            path = source_dir / f"{product.slug}{ext}"
+            if path.exists():
+                return path
+        return None
@@ -0,0 +1,299 @@
+# catalog/management/commands/generate_load_data.py
+"""
+Genera un dataset sintético y reproducible para pruebas de carga.
+
+Por cada unidad de --scale:
+  1.000 productos (12+ categorías, inventario), 500 usuarios con perfil,
+  100 carritos abiertos + 150 expirados, 1.000 pedidos con ítems y pago.
+
+  python manage.py generate_load_data --scale 1      # ~10k filas
+  python manage.py generate_load_data --scale 100    # 100k productos, 50k usuarios, ~1M filas
+
+Todo se inserta con bulk_create en transacciones por lote y con una semilla
+fija (--seed), así que dos corridas sobre una BD vacía producen los mismos
+datos (mismos UUID, nombres, precios y pedidos). La popularidad de los
+productos en pedidos y carritos sigue una distribución tipo Zipf.
+"""
+import bisect
+import itertools
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import Profile
+from cart.models import Cart, CartItem, CartStatus
+from catalog import search
+from catalog.models import Category, Inventory, Product, assign_unique_slugs
+from catalog.versioning import bump_on_commit
+from orders.models import Order, OrderItem, OrderStatus, Payment, PaymentStatus
+
+User = get_user_model()
+
+PER_SCALE = {
+    "products": 1000,
+    "users": 500,
+    "open_carts": 100,
+    "expired_carts": 150,
+    "orders": 1000,
+}
+
+CATEGORIES = [
+    "Accesorios", "Calzado", "Camisetas y Polos", "Chaquetas y Abrigos", "Pantalones",
+    "Ofertas", "Sudaderas", "Gorras", "Bolsos", "Deportivo", "Shorts", "Calcetines",
+]
+NOUNS = ["Camiseta", "Polo", "Sudadera", "Chaqueta", "Jogger", "Jean", "Gorra", "Bolso",
+         "Tenis", "Short", "Cinturón", "Abrigo", "Chaleco", "Bermuda", "Buzo"]
+ADJECTIVES = ["Básica", "Oversize", "Slim", "Urbana", "Clásica", "Técnica", "Vintage",
+              "Essential", "Premium", "Neón", "Cargo", "Ligera", "Térmica"]
+BRANDS = ["Glowbox", "Nike", "Adidas", "Puma", "New Balance", "Converse", "Supreme", "Vans"]
+COLORS = ["Negro", "Blanco", "Gris", "Azul", "Rojo", "Verde Oliva", "Beige", "Rosa"]
+
+# estado del pedido -> (peso, estado del pago)
+ORDER_MIX = {
+    OrderStatus.ENTREGADA: (45, PaymentStatus.CAPTURADO),
+    OrderStatus.ENVIADA: (20, PaymentStatus.CAPTURADO),
+    OrderStatus.PAGADA: (20, PaymentStatus.CAPTURADO),
+    OrderStatus.PENDIENTE: (8, PaymentStatus.AUTORIZADO),
+    OrderStatus.CANCELADA: (7, PaymentStatus.FALLIDO),
+}
+
+
+@contextmanager
+def historic_timestamps(*models):
+    """Desactiva auto_now/auto_now_add para poder insertar fechas del pasado."""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ZipfPicker:
+    """Elige índices 0..n-1 con probabilidad ~ 1/rank^s, con el ranking barajado."""
+
+    def __init__(self, rng, n, s=1.1):
+        ranks = list(range(1, n + 1))
+        rng.shuffle(ranks)
+        self.cum = list(itertools.accumulate(1.0 / (r ** s) for r in ranks))
+        self.rng = rng
+
+    def pick(self):
+        return bisect.bisect_left(self.cum, self.rng.random() * self.cum[-1])
+
+    def sample(self, k):
+        out = set()
+        while len(out) < k:
+            out.add(self.pick())
+        return list(out)
+
+
+class Command(BaseCommand):
+    help = "Genera datos sintéticos a escala (catálogo, usuarios, carritos, pedidos) para benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, default=1, help="Multiplicador de volumen (1 = 1.000 productos).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000, help="Filas por bulk_create/transacción.")
+
+    def handle(self, *args, **opts):
+        scale = opts["scale"]
+        if scale < 1:
+            raise CommandError("--scale debe ser >= 1")
+        self.rng = random.Random(opts["seed"])
+        self.batch_size = opts["batch_size"]
+        self.tag = f"L{opts['seed'] % 1000:03d}"
+        self.now = timezone.now()
+        counts = {k: v * scale for k, v in PER_SCALE.items()}
+
+        if Inventory.objects.filter(sku=f"{self.tag}-{0:08d}").exists():
+            raise CommandError("Esta semilla ya se generó en esta BD: usa otra --seed o una BD limpia.")
+
+        start = time.monotonic()
+        categories = self._categories(scale)
+        products = self._products(categories, counts["products"])
+        users = self._users(counts["users"])
+        picker = ZipfPicker(self.rng, len(products))
+        self._carts(products, users, picker, counts["open_carts"], counts["expired_carts"])
+        self._orders(products, users, picker, counts["orders"])
+
+        self._finish(categories)
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(f"✓ Dataset --scale {scale} generado en {elapsed:.1f}s"))
+
+    # ————— Helpers —————
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _step(self, label, fn):
+        start = time.monotonic()
+        rows = fn() or 0
+        elapsed = max(time.monotonic() - start, 1e-6)
+        rate = f" ({rows / elapsed:,.0f} filas/s)" if rows else ""
+        self.stdout.write(f"  {label}: {rows:,} filas en {elapsed:.1f}s{rate}")
+        return rows
+
+    def _bulk(self, model, objs, **kwargs):
+        """bulk_create en lotes, cada uno en su transacción."""
+        for i in range(0, len(objs), self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(objs[i:i + self.batch_size], **kwargs)
+        return len(objs)
+
+    def _past(self, max_days):
+        return self.now - timedelta(seconds=self.rng.randint(0, max_days * 86400))
+
+    # ————— Catálogo —————
+    def _categories(self, scale):
+        names = list(CATEGORIES) + [f"Colección {i}" for i in range(1, max(0, scale * 2 - len(CATEGORIES)) + 1)]
+        existing = dict(Category.objects.filter(nombre__in=names).values_list("nombre", "id"))
+        new = [Category(id=self._uuid(), nombre=n) for n in names if n not in existing]
+        assign_unique_slugs(new, max_len=140)
+        self._step("Categorías", lambda: self._bulk(Category, new))
+        existing.update((c.nombre, c.id) for c in new)
+        return [existing[n] for n in names]
+
+    def _products(self, categories, n):
+        rng = self.rng
+        taken = set(Product.objects.values_list("slug", flat=True))
+        products, inventories = [], []
+        with historic_timestamps(Product):
+            for i in range(n):
+                name = f"{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.choice(BRANDS)} {rng.choice(COLORS)}"
+                created = self._past(720)
+                stock = rng.choice([0, 0, 3, 8, 15, 40, 120])
+                p = Product(
+                    id=self._uuid(), categoria_id=rng.choice(categories), nombre=name,
+                    descripcion=f"{name}. Referencia {self.tag}-{i:07d}.",
+                    precio=Decimal(rng.randint(990, 49999)) / 100,
+                    activo=rng.random() < 0.95, en_stock=stock > 0,
+                    created_at=created, updated_at=created,
+                )
+                products.append(p)
+                inventories.append(Inventory(id=self._uuid(), producto=p, sku=f"{self.tag}-{i:08d}", stock=stock))
+            assign_unique_slugs(products, max_len=180, taken=taken)
+            self._step("Productos", lambda: self._bulk(Product, products))
+        self._step("Inventarios", lambda: self._bulk(Inventory, inventories))
+        return [(p.id, p.precio) for p in products]
+
+    # ————— Usuarios —————
+    def _users(self, n):
+        password = make_password("loadtest")  # un solo hash: hashear 50k veces tomaría horas
+        users, profiles = [], []
+        for i in range(n):
+            joined = self._past(900)
+            u = User(id=self._uuid(), email=f"user{i:07d}.{self.tag.lower()}@loadtest.glowbox",
+                     password=password, date_joined=joined)
+            users.append(u)
+            profiles.append(Profile(id=self._uuid(), user=u, nombre=f"Usuario {i}",
+                                    telefono=f"3{self.rng.randint(100000000, 199999999)}"))
+        self._step("Usuarios", lambda: self._bulk(User, users))
+        self._step("Perfiles", lambda: self._bulk(Profile, profiles))
+        return [u.id for u in users]
+
+    # ————— Carritos —————
+    def _carts(self, products, users, picker, n_open, n_expired):
+        rng = self.rng
+        carts, items = [], []
+        with historic_timestamps(Cart, CartItem):
+            for i in range(n_open + n_expired):
+                expired = i >= n_open
+                ts = self._past(60) if expired else self.now - timedelta(minutes=rng.randint(0, 30))
+                anon = rng.random() < 0.6
+                cart = Cart(
+                    id=self._uuid(),
+                    usuario_id=None if anon else rng.choice(users),
+                    session_key="" if not anon else uuid.UUID(int=rng.getrandbits(128)).hex,
+                    estado=CartStatus.EXPIRADO if expired else CartStatus.ABIERTO,
+                    created_at=ts, updated_at=ts,
+                )
+                carts.append(cart)
+                if expired and rng.random() < 0.7:
+                    continue  # expire_carts ya les limpió los ítems
+                for idx in picker.sample(rng.randint(1, 4)):
+                    pid, precio = products[idx]
+                    item = CartItem(id=self._uuid(), cart=cart, producto_id=pid,
+                                    cantidad=rng.randint(1, 3), precio_unitario=precio,
+                                    created_at=ts, updated_at=ts)
+                    items.append(item)
+                    cart.items_count += 1
+                    cart.total += item.subtotal
+            self._step("Carritos", lambda: self._bulk(Cart, carts))
+            self._step("Ítems de carrito", lambda: self._bulk(CartItem, items))
+
+    # ————— Pedidos —————
+    def _orders(self, products, users, picker, n):
+        rng = self.rng
+        statuses = list(ORDER_MIX)
+        weights = [w for w, _ in ORDER_MIX.values()]
+        chunk = self.batch_size
+        totals = {"Pedidos": 0, "Ítems de pedido": 0, "Pagos": 0}
+        start = time.monotonic()
+        with historic_timestamps(Order, OrderItem, Payment):
+            for first in range(0, n, chunk):
+                orders, items, payments = [], [], []
+                for i in range(first, min(n, first + chunk)):
+                    status = rng.choices(statuses, weights)[0]
+                    created = self._past(365)
+                    order = Order(
+                        id=self._uuid(), usuario_id=rng.choice(users), numero=f"{self.tag}-{i:09d}",
+                        status=status, created_at=created, updated_at=created,
+                        shipping_name=f"Cliente {i}", shipping_address=f"Calle {rng.randint(1, 200)} # {rng.randint(1, 99)}",
+                    )
+                    if status in (OrderStatus.PAGADA, OrderStatus.ENVIADA, OrderStatus.ENTREGADA):
+                        order.paid_at = created
+                    if status in (OrderStatus.ENVIADA, OrderStatus.ENTREGADA):
+                        order.shipped_at = created + timedelta(days=1)
+                        order.tracking_code = f"TRK{i:09d}"
+                    if status == OrderStatus.ENTREGADA:
+                        order.delivered_at = created + timedelta(days=rng.randint(2, 6))
+                    total = Decimal(0)
+                    for idx in picker.sample(rng.choices([1, 2, 3, 4, 5], [40, 30, 15, 10, 5])[0]):
+                        pid, precio = products[idx]
+                        qty = rng.choices([1, 2, 3], [80, 15, 5])[0]
+                        items.append(OrderItem(id=self._uuid(), orden=order, producto_id=pid,
+                                               cantidad=qty, precio_unitario=precio))
+                        total += precio * qty
+                    order.total = total
+                    orders.append(order)
+                    pay_status = ORDER_MIX[status][1]
+                    payments.append(Payment(
+                        id=self._uuid(), orden=order, proveedor="manual", transaction_id=f"MAN-{order.numero}",
+                        monto=total, status=pay_status, created_at=created, updated_at=created,
+                        reserved_applied=pay_status != PaymentStatus.FALLIDO,
+                        captured_applied=pay_status == PaymentStatus.CAPTURADO,
+                    ))
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    OrderItem.objects.bulk_create(items, batch_size=chunk)
+                    Payment.objects.bulk_create(payments)
+                totals["Pedidos"] += len(orders)
+                totals["Ítems de pedido"] += len(items)
+                totals["Pagos"] += len(payments)
+        elapsed = max(time.monotonic() - start, 1e-6)
+        rows = sum(totals.values())
+        detail = ", ".join(f"{k.lower()}: {v:,}" for k, v in totals.items())
+        self.stdout.write(f"  Pedidos: {rows:,} filas ({detail}) en {elapsed:.1f}s ({rows / elapsed:,.0f} filas/s)")
+
+    def _finish(self, categories):
+        # bulk_create no dispara señales: se recalcula lo que ellas mantenían
+        start = time.monotonic()
+        with transaction.atomic():
+            Category.objects.filter(pk__in=categories).recontar_productos()
+            search.rebuild_index()
+            bump_on_commit()
+        self.stdout.write(f"  Contadores e índice de búsqueda: {time.monotonic() - start:.1f}s")
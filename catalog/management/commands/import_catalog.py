@@ -0,0 +1,282 @@
+# catalog/management/commands/import_catalog.py
+"""
+Importa/actualiza el catálogo desde un feed CSV o JSONL, por lotes.
+
+Columnas/claves: sku (clave de upsert), nombre, categoria, precio,
+descripcion, imagen_url, activo, stock.
+
+Uso:
+  python manage.py import_catalog feed.csv
+  python manage.py import_catalog feed.jsonl --chunk-size 5000
+  python manage.py import_catalog feed.csv --dry-run      # solo muestra el diff
+
+Cada lote se escribe en su propia transacción con bulk_create/bulk_update, sin
+pasar por save() ni señales por fila. Lo que esas señales mantenían (inventario,
+en_stock, contadores de categoría, índice de búsqueda, versión del catálogo) se
+actualiza aquí de forma set-based.
+"""
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from catalog import search
+from catalog.models import SEARCH_FIELDS, Category, Inventory, Product, assign_unique_slugs
+from catalog.versioning import bump_on_commit, bump_versions_on_commit, object_version_key
+
+PRODUCT_FIELDS = ["nombre", "descripcion", "precio", "imagen_url", "activo", "categoria_id"]
+TRUE_VALUES = {"1", "true", "t", "si", "sí", "s", "yes", "y"}
+
+
+class RowError(ValueError):
+    pass
+
+
+def _parse_row(raw):
+    """Normaliza una fila del feed. Lanza RowError si no es válida."""
+    get = lambda k: ("" if raw.get(k) is None else str(raw.get(k))).strip()  # noqa: E731
+    sku, nombre, categoria = get("sku"), get("nombre"), get("categoria")
+    if not sku:
+        raise RowError("falta 'sku'")
+    if not nombre:
+        raise RowError("falta 'nombre'")
+    if not categoria:
+        raise RowError("falta 'categoria'")
+    try:
+        precio = Decimal(get("precio"))
+    except InvalidOperation:
+        raise RowError(f"precio inválido: {get('precio')!r}")
+    if precio < 0:
+        raise RowError("precio negativo")
+    precio = precio.quantize(Decimal("0.01"))
+    try:
+        stock = int(get("stock") or 0)
+    except ValueError:
+        raise RowError(f"stock inválido: {get('stock')!r}")
+    if stock < 0:
+        raise RowError("stock negativo")
+    activo = raw.get("activo")
+    if isinstance(activo, bool):
+        pass
+    elif activo in (None, ""):
+        activo = True
+    else:
+        activo = str(activo).strip().lower() in TRUE_VALUES
+    return {
+        "sku": sku,
+        "nombre": nombre[:160],
+        "categoria": categoria[:120],
+        "precio": precio,
+        "descripcion": get("descripcion"),
+        "imagen_url": get("imagen_url"),
+        "activo": activo,
+        "stock": stock,
+    }
+
+
+def _read_rows(path, fmt):
+    """Genera (número de línea, dict) sin cargar el archivo completo."""
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        if fmt == "csv":
+            for i, row in enumerate(csv.DictReader(fh), start=2):
+                yield i, row
+        else:
+            for i, line in enumerate(fh, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield i, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield i, e
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = "Importa productos, categorías e inventario desde CSV/JSONL con operaciones masivas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo .csv o .jsonl")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Por defecto se deduce de la extensión.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="No escribe; muestra qué cambiaría.")
+
+    def handle(self, *args, **opts):
+        path = Path(opts["path"])
+        if not path.exists():
+            raise CommandError(f"No existe el archivo {path}")
+        fmt = opts["format"] or ("jsonl" if path.suffix.lower() in {".jsonl", ".ndjson"} else "csv")
+        self.dry_run = opts["dry_run"]
+        self.category_ids = dict(Category.objects.values_list("nombre", "id"))
+        self.touched_categories = set()
+        self.catalog_changed = False  # también por cambios solo de stock (no tocan categorías)
+        self.stats = dict(rows=0, errors=0, created=0, updated=0, unchanged=0, categories=0)
+
+        start = time.monotonic()
+        for chunk in _chunks(_read_rows(path, fmt), opts["chunk_size"]):
+            rows = {}
+            for lineno, raw in chunk:
+                self.stats["rows"] += 1
+                try:
+                    if isinstance(raw, Exception):
+                        raise RowError(f"JSON inválido: {raw}")
+                    row = _parse_row(raw)
+                except RowError as e:
+                    self.stats["errors"] += 1
+                    self.stderr.write(f"  línea {lineno}: {e}")
+                    continue
+                rows[row["sku"]] = row  # SKU repetido en el lote: gana la última fila
+            if rows:
+                if self.dry_run:
+                    self._diff_chunk(rows)
+                else:
+                    with transaction.atomic():
+                        self._import_chunk(rows)
+
+        if not self.dry_run and self.catalog_changed:
+            with transaction.atomic():
+                if self.touched_categories:
+                    Category.objects.filter(pk__in=self.touched_categories).recontar_productos()
+                bump_on_commit()
+
+        elapsed = max(time.monotonic() - start, 1e-6)
+        s = self.stats
+        verb = "Cambiaría" if self.dry_run else "Importado"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb}: {s['created']} nuevos, {s['updated']} actualizados, {s['unchanged']} sin cambios, "
+            f"{s['categories']} categorías nuevas, {s['errors']} errores."
+        ))
+        self.stdout.write(f"{s['rows']} filas en {elapsed:.2f}s ({s['rows'] / elapsed:,.0f} filas/s)")
+
+    # ————— Lectura del estado actual —————
+    def _existing(self, skus):
+        """{sku: Inventory} con su producto cargado, en una consulta."""
+        return {
+            inv.sku: inv
+            for inv in Inventory.objects.filter(sku__in=skus).select_related("producto")
+        }
+
+    def _ensure_categories(self, names):
+        missing = sorted({n for n in names if n not in self.category_ids})
+        if not missing:
+            return
+        self.stats["categories"] += len(missing)
+        if self.dry_run:
+            for name in missing:
+                self.stdout.write(f"+ categoría {name}")
+                self.category_ids[name] = None
+            return
+        cats = assign_unique_slugs([Category(nombre=n) for n in missing], max_len=140)
+        Category.objects.bulk_create(cats, ignore_conflicts=True)
+        # con ignore_conflicts los ids en memoria no son fiables: se releen
+        self.category_ids.update(Category.objects.filter(nombre__in=missing).values_list("nombre", "id"))
+
+    def _changes(self, product, row):
+        values = {**row, "categoria_id": self.category_ids.get(row["categoria"])}
+        return {
+            f: (getattr(product, f), values[f])
+            for f in PRODUCT_FIELDS
+            if getattr(product, f) != values[f]
+        }
+
+    # ————— Dry run —————
+    def _diff_chunk(self, rows):
+        self._ensure_categories(r["categoria"] for r in rows.values())
+        existing = self._existing(list(rows))
+        for sku, row in rows.items():
+            inv = existing.get(sku)
+            if inv is None:
+                self.stats["created"] += 1
+                self.stdout.write(f"+ {sku} {row['nombre']} ({row['categoria']}) ${row['precio']} stock={row['stock']}")
+                continue
+            changes = self._changes(inv.producto, row)
+            if inv.stock != row["stock"]:
+                changes["stock"] = (inv.stock, row["stock"])
+            if not changes:
+                self.stats["unchanged"] += 1
+                continue
+            self.stats["updated"] += 1
+            detail = ", ".join(f"{f}: {old!r} → {new!r}" for f, (old, new) in changes.items())
+            self.stdout.write(f"~ {sku} {detail}")
+
+    # ————— Escritura —————
+    def _import_chunk(self, rows):
+        self._ensure_categories(r["categoria"] for r in rows.values())
+        existing = self._existing(list(rows))
+        now = timezone.now()
+
+        new_products, changed_products, inventories, product_ids = [], [], [], []
+        stale = []  # versiones por objeto de los productos existentes que cambiaron (detalle cacheado)
+        for sku, row in rows.items():
+            cat_id = self.category_ids[row["categoria"]]
+            inv = existing.get(sku)
+            if inv is None:
+                product = Product(
+                    categoria_id=cat_id, nombre=row["nombre"], descripcion=row["descripcion"],
+                    precio=row["precio"], imagen_url=row["imagen_url"], activo=row["activo"],
+                    en_stock=row["stock"] > 0,
+                )
+                new_products.append(product)
+                inventories.append(Inventory(producto=product, sku=sku, stock=row["stock"]))
+                self.touched_categories.add(cat_id)
+                continue
+
+            if row["stock"] < inv.reservado:
+                self.stats["errors"] += 1
+                self.stderr.write(f"  {sku}: stock {row['stock']} menor que lo reservado ({inv.reservado}); se omite")
+                continue
+
+            product = inv.producto
+            changes = self._changes(product, row)
+            en_stock = row["stock"] > inv.reservado
+            if changes or product.en_stock != en_stock:
+                self.touched_categories.update({product.categoria_id, cat_id})
+                product.categoria_id = cat_id
+                for f in ("nombre", "descripcion", "precio", "imagen_url", "activo"):
+                    setattr(product, f, row[f])
+                product.en_stock = en_stock
+                product.updated_at = now
+                changed_products.append(product)
+                self.catalog_changed = True
+            if changes or inv.stock != row["stock"]:
+                self.stats["updated"] += 1
+                self.catalog_changed = True
+                stale.append(object_version_key("product", product.pk))
+            else:
+                self.stats["unchanged"] += 1
+            inventories.append(Inventory(producto_id=product.pk, sku=sku, stock=row["stock"]))
+            if changes.keys() & SEARCH_FIELDS:
+                # precio, imagen o stock no afectan al índice de búsqueda
+                product_ids.append(product.pk)
+
+        if new_products:
+            assign_unique_slugs(new_products, max_len=180)
+            Product.objects.bulk_create(new_products)
+            self.stats["created"] += len(new_products)
+            self.catalog_changed = True
+            product_ids += [p.pk for p in new_products]
+        if changed_products:
+            Product.objects.bulk_update(changed_products, PRODUCT_FIELDS + ["en_stock", "updated_at"])
+        if inventories:
+            # upsert por SKU: los nuevos se insertan, los existentes solo cambian stock
+            Inventory.objects.bulk_create(
+                inventories, update_conflicts=True, unique_fields=["sku"], update_fields=["stock"],
+            )
+        if product_ids:
+            search.rebuild_index(product_ids)
+        bump_versions_on_commit(stale)
@@ -0,0 +1,16 @@
+# catalog/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog import search
+from catalog.models import Product
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de productos (FTS5 en SQLite)."
+
+    @transaction.atomic
+    def handle(self, *args, **opts):
+        search.rebuild_index()
+        total = Product.objects.activos().count()
+        self.stdout.write(self.style.SUCCESS(f"Índice de búsqueda reconstruido: {total} productos activos."))
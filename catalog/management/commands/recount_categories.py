@@ -0,0 +1,14 @@
+# catalog/management/commands/recount_categories.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog.models import Category
+
+
+class Command(BaseCommand):
+    help = "Recalcula Category.active_product_count con un único UPDATE set-based."
+
+    @transaction.atomic
+    def handle(self, *args, **opts):
+        updated = Category.objects.recontar_productos()
+        self.stdout.write(self.style.SUCCESS(f"Categorías recontadas: {updated}"))
@@ -0,0 +1,35 @@
+# catalog/management/commands/sync_availability.py
+"""
+Recalcula Product.en_stock desde Inventory y verifica que quede consistente.
+
+Uso:
+  python manage.py sync_availability           # backfill + verificación
+  python manage.py sync_availability --check   # solo verifica (falla si hay diferencias)
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from catalog.models import Product
+
+
+class Command(BaseCommand):
+    help = "Backfill y verificación de la columna desnormalizada Product.en_stock."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true",
+                            help="No escribe nada; termina con error si hay productos desincronizados.")
+
+    def handle(self, *args, **opts):
+        if not opts["check"]:
+            with transaction.atomic():
+                updated = Product.objects.sincronizar_en_stock()
+            self.stdout.write(f"Productos recalculados: {updated}")
+
+        bad = Product.objects.desincronizados()
+        total = bad.count()
+        if total:
+            sample = ", ".join(str(p) for p in bad[:10])
+            raise CommandError(f"{total} producto(s) con en_stock desincronizado: {sample}")
+
+        en_stock = Product.objects.filter(en_stock=True).count()
+        self.stdout.write(self.style.SUCCESS(f"✓ en_stock consistente ({en_stock} productos con stock)."))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0003_alter_category_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["precio", "id"], name="catalog_pro_precio_f5303b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["categoria", "activo", "-created_at"],
+                name="catalog_pro_categor_f7cdd0_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["categoria", "activo", "precio"],
+                name="catalog_pro_categor_cd8586_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# DDL congelado en esta migración (no importa catalog.search: el esquema actual
+# del índice puede cambiar en migraciones posteriores, ver 0011).
+FTS_TABLE = "catalog_product_fts"
+PG_INDEX = "catalog_product_search_gin"
+PG_DOCUMENT = "to_tsvector('spanish', coalesce(nombre, '') || ' ' || coalesce(descripcion, ''))"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "product_id UNINDEXED, categoria_id UNINDEXED, nombre, descripcion, categoria, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (product_id, categoria_id, nombre, descripcion, categoria) "
+            "SELECT p.id, p.categoria_id, p.nombre, p.descripcion, c.nombre "
+            "FROM catalog_product p JOIN catalog_category c ON c.id = p.categoria_id "
+            "WHERE p.activo"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON catalog_product USING GIN (({PG_DOCUMENT}))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0004_product_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
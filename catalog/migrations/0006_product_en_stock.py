@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:30
+
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef
+
+
+def backfill_en_stock(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    Inventory = apps.get_model("catalog", "Inventory")
+    Product.objects.update(
+        en_stock=Exists(
+            Inventory.objects.filter(producto=OuterRef("pk"), stock__gt=F("reservado"))
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0005_product_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="en_stock",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["activo", "en_stock", "-created_at"],
+                name="catalog_pro_activo_511b56_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_en_stock, migrations.RunPython.noop),
+    ]
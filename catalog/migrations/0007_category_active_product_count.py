@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    Product = apps.get_model("catalog", "Product")
+    activos = (
+        Product.objects.filter(categoria=OuterRef("pk"), activo=True)
+        .order_by()
+        .values("categoria")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Category.objects.update(active_product_count=Coalesce(Subquery(activos), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0006_product_en_stock"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="active_product_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
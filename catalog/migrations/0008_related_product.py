@@ -0,0 +1,72 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0007_category_active_product_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedProduct",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[("SIMILAR", "Similares")],
+                        default="SIMILAR",
+                        max_length=20,
+                    ),
+                ),
+                ("posicion", models.PositiveSmallIntegerField(default=0)),
+                ("score", models.FloatField(default=0)),
+                (
+                    "producto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="relacionados",
+                        to="catalog.product",
+                    ),
+                ),
+                (
+                    "relacionado",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="catalog.product",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["producto", "tipo", "posicion"],
+                "indexes": [
+                    models.Index(
+                        fields=["producto", "tipo", "posicion"],
+                        name="catalog_rel_product_643bce_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="relatedproduct",
+            constraint=models.UniqueConstraint(
+                fields=("producto", "tipo", "relacionado"), name="uniq_related_product"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0008_related_product"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="imagenes",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
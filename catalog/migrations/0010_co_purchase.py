@@ -0,0 +1,94 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_product_imagenes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CoPurchaseRun",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("hasta", models.DateTimeField(blank=True, null=True)),
+                ("pedidos", models.PositiveIntegerField(default=0)),
+                ("pares", models.PositiveIntegerField(default=0)),
+                ("completo", models.BooleanField(default=False)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AlterField(
+            model_name="relatedproduct",
+            name="tipo",
+            field=models.CharField(
+                choices=[
+                    ("SIMILAR", "Similares"),
+                    ("COMPRADOS_JUNTOS", "Comprados juntos"),
+                ],
+                default="SIMILAR",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="CoPurchase",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("veces", models.PositiveIntegerField(default=0)),
+                (
+                    "producto_a",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="catalog.product",
+                    ),
+                ),
+                (
+                    "producto_b",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="catalog.product",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["producto_b"], name="catalog_cop_product_1f8809_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="copurchase",
+            constraint=models.UniqueConstraint(
+                fields=("producto_a", "producto_b"), name="uniq_copurchase_pair"
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+import uuid
+
+from django.db import migrations
+
+# DDL congelado en esta migración (no importa catalog.search). Solo SQLite: en
+# PostgreSQL el índice GIN de 0005 no cambia.
+FTS_TABLE = "catalog_product_fts"
+FTS_CREATE = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "product_id UNINDEXED, categoria_id UNINDEXED, nombre, descripcion, categoria, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+FTS_SOURCE = (
+    "FROM catalog_product p JOIN catalog_category c ON c.id = p.categoria_id WHERE p.activo"
+)
+
+
+def _fts_rowid(pk):
+    # los 63 bits altos del UUID (mismo cálculo que catalog.search._rowid)
+    return uuid.UUID(str(pk)).int >> 65
+
+
+def rowid_index(apps, schema_editor):
+    # las filas pasan a identificarse por rowid (derivado del UUID) en vez de product_id
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return
+    conn.ensure_connection()
+    conn.connection.create_function("fts_rowid", 1, _fts_rowid, deterministic=True)
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    schema_editor.execute(FTS_CREATE)
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, product_id, categoria_id, nombre, descripcion, categoria) "
+        f"SELECT fts_rowid(p.id), p.id, p.categoria_id, p.nombre, p.descripcion, c.nombre {FTS_SOURCE}"
+    )
+
+
+def product_id_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    schema_editor.execute(FTS_CREATE)
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (product_id, categoria_id, nombre, descripcion, categoria) "
+        f"SELECT p.id, p.categoria_id, p.nombre, p.descripcion, c.nombre {FTS_SOURCE}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_co_purchase"),
+    ]
+
+    operations = [
+        migrations.RunPython(rowid_index, product_id_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_product_search_index_rowid"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="catalog_pro_created_eee82f_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="catalog_pro_categor_f7cdd0_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="catalog_pro_categor_cd8586_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="catalog_pro_activo_511b56_idx",
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="catalog_pro_created_d4030d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["categoria", "activo", "-created_at", "-id"],
+                name="catalog_pro_categor_cef892_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["categoria", "activo", "precio", "id"],
+                name="catalog_pro_categor_b543de_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["activo", "en_stock", "-created_at", "-id"],
+                name="catalog_pro_activo_4f5010_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,6 @@
 from django.db import models
-from django.db.models import F, Q
-from django.db.models.functions import Lower
+from django.db.models import DEFERRED, Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest, Lower
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from django.utils.text import slugify
@@ -9,54 +9,171 @@ from django.db import transaction
 
 
 # ---------- Utils ----------
+SLUG_SUFFIX_MAX = 11  # "-" + hasta 10 dígitos
+
+
+def _slug_base(instance, value, max_len):
+    base = slugify(value or "")[:max_len]
+    if not base:
+        base = str(instance.pk)[:8]
+    return base
+
+
+def _prefix_q(field, prefix):
+    """
+    `field` empieza con `prefix`, como rango (>= prefix, < siguiente prefijo) y no
+    con startswith: en SQLite el LIKE no usa el índice y recorre la tabla.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper})
+
+
+def _slug_candidates_q(base, slug_field_name, max_len):
+    """Q que trae, en una consulta, todos los slugs que podrían chocar con `base`."""
+    if len(base) + SLUG_SUFFIX_MAX > max_len:
+        # con sufijo el slug se trunca: los candidatos comparten un prefijo más corto
+        return _prefix_q(slug_field_name, base[: max_len - SLUG_SUFFIX_MAX])
+    # base o base-*: en un slug "-" es el único carácter menor que ".", así que
+    # [base, base + ".") es exactamente ese conjunto y sale en un solo rango
+    return Q(**{f"{slug_field_name}__gte": base, f"{slug_field_name}__lt": f"{base}."})
+
+
+def _next_free_slug(base, taken, max_len, start=2):
+    """Devuelve (slug, próximo sufijo a probar)."""
+    if base not in taken:
+        return base, start
+    i = start
+    while True:
+        suffix = f"-{i}"
+        slug = base[: max_len - len(suffix)] + suffix
+        if slug not in taken:
+            return slug, i + 1
+        i += 1
+
+
 def unique_slugify(instance, value, slug_field_name="slug", max_len=180):
     """
     Genera un slug único a partir de `value`. Si existe, agrega sufijos -2, -3...
+    Trae todos los slugs que colisionan en una sola consulta y elige el sufijo en memoria.
     """
-    base = slugify(value or "")[:max_len]
-    if not base:
-        base = str(instance.pk)[:8]  
-    slug = base
+    base = _slug_base(instance, value, max_len)
     Model = type(instance)
-    i = 2
-    while Model.objects.filter(**{slug_field_name: slug}).exclude(pk=instance.pk).exists():
-        suffix = f"-{i}"
-        slug = (base[: max_len - len(suffix)]) + suffix
-        i += 1
-    return slug
+    taken = set(
+        Model.objects.filter(_slug_candidates_q(base, slug_field_name, max_len))
+        .exclude(pk=instance.pk)
+        .order_by()
+        .values_list(slug_field_name, flat=True)
+    )
+    return _next_free_slug(base, taken, max_len)[0]
+
+
+def assign_unique_slugs(instances, source_field="nombre", slug_field_name="slug", max_len=180, chunk_size=100,
+                        taken=None):
+    """
+    Asigna slugs únicos a muchas instancias sin guardar (p.ej. antes de un
+    `bulk_create`). Las colisiones se consultan por lotes de bases y los sufijos
+    se eligen en memoria, así que miles de nombres parecidos no cuestan una
+    consulta por sufijo. Las instancias que ya traen slug lo conservan.
+
+    Si se pasa `taken` (set con los slugs ya usados) no se consulta la BD y el
+    set se actualiza con los slugs asignados; útil para generar muchos lotes.
+    """
+    instances = list(instances)
+    if not instances:
+        return instances
+    Model = type(instances[0])
+
+    pending = [obj for obj in instances if not getattr(obj, slug_field_name)]
+    bases = {id(obj): _slug_base(obj, getattr(obj, source_field), max_len) for obj in pending}
+
+    if taken is None:
+        taken = set()
+        distinct = sorted(set(bases.values()))
+        for i in range(0, len(distinct), chunk_size):
+            cond = Q()
+            for base in distinct[i:i + chunk_size]:
+                cond |= _slug_candidates_q(base, slug_field_name, max_len)
+            taken.update(Model.objects.filter(cond).order_by().values_list(slug_field_name, flat=True))
+    taken.update(getattr(obj, slug_field_name) for obj in instances if getattr(obj, slug_field_name))
+
+    next_suffix = {}  # base -> sufijo desde el que seguir buscando
+    for obj in pending:
+        base = bases[id(obj)]
+        slug, next_suffix[base] = _next_free_slug(base, taken, max_len, next_suffix.get(base, 2))
+        setattr(obj, slug_field_name, slug)
+        taken.add(slug)
+    return instances
 
 
 # ---------- Category ----------
+class CategoryQuerySet(models.QuerySet):
+    def ajustar_conteo(self, delta: int):
+        """Suma `delta` al contador de productos activos (nunca baja de 0)."""
+        return self.update(active_product_count=Greatest(F("active_product_count") + delta, 0))
+
+    def recontar_productos(self):
+        """Recalcula `active_product_count` con un único UPDATE ... SET = (subconsulta)."""
+        activos = (
+            Product.objects.filter(categoria=OuterRef("pk"), activo=True)
+            .order_by()
+            .values("categoria")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return self.update(active_product_count=Coalesce(Subquery(activos), 0))
+
+
+class CategoryManager(models.Manager):
+    def get_queryset(self):
+        return CategoryQuerySet(self.model, using=self._db)
+
+    def recontar_productos(self):
+        return self.get_queryset().recontar_productos()
+
+
 class Category(UUIDModel):
     nombre = models.CharField(max_length=120, unique=True)
     descripcion = models.TextField(blank=True)
     slug = models.SlugField(max_length=140, unique=True, blank=True)
+    # contador desnormalizado de productos activos (lo mantiene Product)
+    active_product_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CategoryManager()
 
     class Meta:
         ordering = ['nombre']
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base = slugify(self.nombre)
-            slug = base
-            i = 2
             # garantizar unicidad si existen nombres repetidos
-            from django.db.models import Q
-            while Category.objects.filter(Q(slug=slug)).exclude(pk=self.pk).exists():
-                slug = f"{base}-{i}"
-                i += 1
-            self.slug = slug
+            self.slug = unique_slugify(self, self.nombre, slug_field_name="slug", max_len=140)
         return super().save(*args, **kwargs)
 
 
 # ---------- Product ----------
 class ProductQuerySet(models.QuerySet):
+    # `activo=True` se compila como `WHERE "activo"` (sin "= 1") y SQLite no usa
+    # una expresión así como igualdad sobre un índice compuesto; con IN sí, y los
+    # listados por categoría ordenan desde (categoria, activo, orden, id).
     def activos(self):
-        return self.filter(activo=True)
+        return self.filter(activo__in=[True])
 
     def disponibles(self):
-        # disponible si stock > reservado
-        return self.activos().filter(inventario__stock__gt=F("inventario__reservado"))
+        # disponible si stock > reservado (columna desnormalizada, ver Inventory.save)
+        return self.activos().filter(en_stock__in=[True])
+
+    def _en_stock_real(self):
+        return Exists(Inventory.objects.filter(producto=OuterRef("pk"), stock__gt=F("reservado")))
+
+    def sincronizar_en_stock(self):
+        """Recalcula `en_stock` desde Inventory con un único UPDATE. Devuelve filas afectadas."""
+        return self.update(en_stock=self._en_stock_real())
+
+    def desincronizados(self):
+        """Productos cuyo `en_stock` no coincide con su inventario."""
+        return self.annotate(_real=self._en_stock_real()).filter(
+            Q(en_stock=True, _real=False) | Q(en_stock=False, _real=True)
+        )
 
 
 class ProductManager(models.Manager):
@@ -69,6 +186,22 @@ class ProductManager(models.Manager):
     def disponibles(self):
         return self.get_queryset().disponibles()
 
+    def sincronizar_en_stock(self):
+        return self.get_queryset().sincronizar_en_stock()
+
+    def desincronizados(self):
+        return self.get_queryset().desincronizados()
+
+
+# campos que alimentan el índice de búsqueda (ver search.py)
+SEARCH_FIELDS = ("nombre", "descripcion", "categoria_id", "activo")
+
+
+def search_state(product):
+    """Valores indexados tal como están en la instancia; None si alguno está diferido."""
+    values = tuple(product.__dict__.get(f, DEFERRED) for f in SEARCH_FIELDS)
+    return None if DEFERRED in values else values
+
 
 class Product(UUIDModel, TimeStampedModel):
     categoria = models.ForeignKey(Category, on_delete=models.PROTECT, related_name="productos")
@@ -78,6 +211,10 @@ class Product(UUIDModel, TimeStampedModel):
     imagen_url = models.URLField(blank=True)
     activo = models.BooleanField(default=True)
     slug = models.SlugField(max_length=180, unique=True, blank=True)
+    # desnormalizado: inventario.stock > inventario.reservado (lo mantiene Inventory)
+    en_stock = models.BooleanField(default=False, editable=False)
+    # variantes redimensionadas de imagen_url (ver catalog/images.py)
+    imagenes = models.JSONField(default=dict, blank=True, editable=False)
 
     objects = ProductManager()
 
@@ -91,17 +228,55 @@ class Product(UUIDModel, TimeStampedModel):
             models.Index(fields=["slug"]),
             models.Index(fields=["activo"]),
             models.Index(fields=["categoria", "activo"]),
-            models.Index(fields=["-created_at"]),
+            # paginación por cursor (ver catalog/pagination.py): el id desempata
+            # y también tiene que salir del índice para que no haya sort aparte
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["precio", "id"]),
+            models.Index(fields=["categoria", "activo", "-created_at", "-id"]),
+            models.Index(fields=["categoria", "activo", "precio", "id"]),
+            models.Index(fields=["activo", "en_stock", "-created_at", "-id"]),
         ]
 
     def clean(self):
         if self.precio is None or self.precio < 0:
             raise ValidationError({"precio": "El precio debe ser mayor o igual a 0."})
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counter_state = (instance.__dict__.get("categoria_id"), instance.__dict__.get("activo"))
+        instance._search_state = search_state(instance)
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug and self.nombre:
             self.slug = unique_slugify(self, self.nombre, slug_field_name="slug", max_len=180)
-        return super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"categoria", "categoria_id", "activo"} & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            old = None
+            if not self._state.adding:
+                old = getattr(self, "_counter_state", (None, None))
+                if None in old:
+                    # instancia sin estado cargado (p.ej. only()/defer()): se lee de la BD
+                    old = Product.objects.filter(pk=self.pk).values_list("categoria_id", "activo").first()
+            result = super().save(*args, **kwargs)
+            self._update_category_counters(old)
+        return result
+
+    def _update_category_counters(self, old):
+        """Mantiene Category.active_product_count tras crear/editar (misma transacción)."""
+        new = (self.categoria_id, self.activo)
+        if old == new:
+            return
+        old_cat, old_activo = old or (None, False)
+        if old_cat and old_activo:
+            Category.objects.filter(pk=old_cat).ajustar_conteo(-1)
+        if self.categoria_id and self.activo:
+            Category.objects.filter(pk=self.categoria_id).ajustar_conteo(+1)
+        self._counter_state = new
 
     def __str__(self):
         return self.nombre
@@ -136,6 +311,19 @@ class Inventory(UUIDModel):
             models.Index(fields=["sku"]),
         ]
 
+    def save(self, *args, **kwargs):
+        # toda escritura de stock/reservado (incluidas reservar/liberar/comprometer)
+        # pasa por aquí: Product.en_stock se actualiza en la misma transacción
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_en_stock()
+
+    def sync_en_stock(self):
+        """Copia 'hay disponible' a Product.en_stock con un UPDATE (sin leer la fila)."""
+        Product.objects.filter(pk=self.producto_id).update(
+            en_stock=Exists(Inventory.objects.filter(pk=self.pk, stock__gt=F("reservado")))
+        )
+
     def disponible(self) -> int:
         """Stock disponible para vender (no reservado)."""
         return int((self.stock or 0) - (self.reservado or 0))
@@ -176,4 +364,70 @@ class Inventory(UUIDModel):
             else:
                 inv.reservado = F("reservado") - cantidad
                 inv.stock = F("stock") - cantidad
-            inv.save(update_fields=["reservado", "stock"])
\ No newline at end of file
+            inv.save(update_fields=["reservado", "stock"])
+
+# ---------- Productos relacionados ----------
+class RelatedKind(models.TextChoices):
+    SIMILAR = "SIMILAR", "Similares"
+    COMPRADOS_JUNTOS = "COMPRADOS_JUNTOS", "Comprados juntos"
+
+
+class RelatedProduct(UUIDModel, TimeStampedModel):
+    """
+    Lista precalculada de productos relacionados (la llena un job batch, p.ej.
+    `build_related_products`). El detalle la lee con una sola consulta indexada.
+    """
+    producto = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="relacionados")
+    relacionado = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    tipo = models.CharField(max_length=20, choices=RelatedKind.choices, default=RelatedKind.SIMILAR)
+    posicion = models.PositiveSmallIntegerField(default=0)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ["producto", "tipo", "posicion"]
+        constraints = [
+            models.UniqueConstraint(fields=["producto", "tipo", "relacionado"], name="uniq_related_product"),
+        ]
+        indexes = [
+            models.Index(fields=["producto", "tipo", "posicion"]),
+        ]
+
+    def __str__(self):
+        return f"{self.producto} → {self.relacionado} ({self.tipo})"
+
+
+class CoPurchase(models.Model):
+    """
+    Matriz dispersa de co-ocurrencia de compras: en cuántos pedidos pagados
+    aparecen juntos producto_a y producto_b (se guarda solo a <= b). La diagonal
+    (a == b) es el número de pedidos que contienen el producto. La mantiene
+    `build_bought_together`, que luego deriva RelatedProduct(COMPRADOS_JUNTOS).
+    """
+    producto_a = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    producto_b = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    veces = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["producto_a", "producto_b"], name="uniq_copurchase_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["producto_b"]),
+        ]
+
+    def __str__(self):
+        return f"{self.producto_a_id} + {self.producto_b_id}: {self.veces}"
+
+
+class CoPurchaseRun(UUIDModel, TimeStampedModel):
+    """Ejecución de `build_bought_together`; `hasta` es la marca para la siguiente incremental."""
+    hasta = models.DateTimeField(null=True, blank=True)
+    pedidos = models.PositiveIntegerField(default=0)
+    pares = models.PositiveIntegerField(default=0)
+    completo = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M} · {self.pedidos} pedidos hasta {self.hasta}"
@@ -0,0 +1,194 @@
+"""
+Paginación por cursor (keyset) para listados de productos.
+
+En vez de OFFSET, cada página se pide con un cursor opaco que codifica la
+última fila vista (valor de orden + id). La consulta queda como
+`WHERE orden >= valor AND (orden > valor OR (orden = valor AND id > pk))
+ORDER BY orden, id LIMIT n`: la cota suelta es la que el motor usa como inicio
+del rango sobre el índice compuesto (orden, id), que además entrega las filas ya
+ordenadas, así que la página 1 y la página 10.000 cuestan lo mismo.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# clave -> (etiqueta, campo de orden, descendente)
+SORTS = {
+    "nuevos": ("Más nuevos", "created_at", True),
+    "precio_asc": ("Precio: menor a mayor", "precio", False),
+    "precio_desc": ("Precio: mayor a menor", "precio", True),
+}
+DEFAULT_SORT = "nuevos"
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def _load(field, value):
+    if field == "created_at":
+        return parse_datetime(value)
+    if field == "precio":
+        return Decimal(value)
+    if field == "id":
+        return uuid.UUID(value)
+    return value
+
+
+def _get(obj, field):
+    return obj[field] if isinstance(obj, dict) else getattr(obj, field)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """
+    Página de resultados. La consulta se ejecuta perezosamente al primer acceso,
+    así que si la plantilla sirve la grilla desde caché no se toca la BD.
+    """
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+        self._result = None
+
+    def _get(self):
+        if self._result is None:
+            self._result = self._fetch()
+        return self._result
+
+    @property
+    def object_list(self):
+        return self._get()[0]
+
+    @property
+    def next_cursor(self):
+        return self._get()[1]
+
+    @property
+    def prev_cursor(self):
+        return self._get()[2]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Pagina `queryset` según uno de los modos de `SORTS`, usando `id` como
+    desempate para que el orden sea total.
+
+    Funciona tanto con instancias de modelo como con `values()` (dicts),
+    siempre que el campo de orden y `id` estén presentes.
+    """
+
+    def __init__(self, queryset, per_page, sort=DEFAULT_SORT):
+        if sort not in SORTS:
+            sort = DEFAULT_SORT
+        self.queryset = queryset
+        self.per_page = per_page
+        self.sort = sort
+        _, self.field, self.desc = SORTS[sort]
+
+    # ————— Cursores —————
+    def encode_cursor(self, obj, direction):
+        payload = [direction, _dump(_get(obj, self.field)), _dump(_get(obj, "id"))]
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, value, pk = json.loads(raw)
+            if direction not in ("n", "p"):
+                raise ValueError(direction)
+            value = _load(self.field, value)
+            if value is None:
+                raise ValueError(cursor)
+            return direction, value, _load("id", pk)
+        except (ValueError, TypeError, ArithmeticError) as e:
+            raise InvalidCursor(cursor) from e
+
+    # ————— Páginas —————
+    def _ordering(self, reverse=False):
+        desc = self.desc != reverse
+        prefix = "-" if desc else ""
+        return [f"{prefix}{self.field}", f"{prefix}id"]
+
+    def _after(self, value, pk, reverse=False):
+        """
+        Filas estrictamente posteriores a (value, pk) en el orden pedido. La cota
+        `campo <= value` (o >=) va aparte del OR para que el motor la use como
+        inicio del rango sobre el índice (campo, id) en vez de recorrerlo entero.
+        """
+        op = "lt" if (self.desc != reverse) else "gt"
+        bound = Q(**{f"{self.field}__{op}e": value})
+        return bound & (Q(**{f"{self.field}__{op}": value}) | Q(**{self.field: value, f"id__{op}": pk}))
+
+    def page(self, cursor=None):
+        """Devuelve la página indicada por `cursor` (o la primera si es None)."""
+        direction, value, pk = ("n", None, None)
+        if cursor:
+            direction, value, pk = self.decode_cursor(cursor)
+        return KeysetPage(lambda: self._fetch(cursor, direction, value, pk))
+
+    def _fetch(self, cursor, direction, value, pk):
+        backwards = direction == "p"
+        qs = self.queryset.order_by(*self._ordering(reverse=backwards))
+        if cursor:
+            qs = qs.filter(self._after(value, pk, reverse=backwards))
+
+        rows = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return [], None, None
+
+        # Hacia adelante: siempre hay anterior si vinimos con cursor.
+        # Hacia atrás: siempre hay siguiente (la página desde la que volvimos).
+        if backwards:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(cursor)
+
+        return (
+            rows,
+            self.encode_cursor(rows[-1], "n") if has_next else None,
+            self.encode_cursor(rows[0], "p") if has_prev else None,
+        )
+
+    def get_page(self, cursor=None):
+        """Como `page`, pero un cursor inválido devuelve la primera página."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
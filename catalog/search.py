@@ -0,0 +1,183 @@
+"""
+Búsqueda de texto completo sobre productos.
+
+- SQLite: tabla virtual FTS5 `catalog_product_fts` (índice invertido), que se
+  mantiene incrementalmente desde las señales de Product/Category.
+- PostgreSQL: índice GIN sobre `to_tsvector(nombre || descripcion)`; Postgres lo
+  mantiene solo, no hay tabla auxiliar.
+- Otros motores: `icontains` como último recurso.
+
+Ambos caminos soportan ranking (bm25 / ts_rank) y prefijos ("cami" -> "camiseta").
+"""
+import re
+import uuid
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import SEARCH_FIELDS, Product, search_state
+
+FTS_TABLE = "catalog_product_fts"
+PG_CONFIG = "spanish"
+# tiene que coincidir con la expresión del índice GIN (migración 0005) para usarlo
+PG_DOCUMENT = "to_tsvector('spanish', coalesce(nombre, '') || ' ' || coalesce(descripcion, ''))"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(query):
+    return _TOKEN_RE.findall((query or "").lower())[:8]
+
+
+def _vendor():
+    return connection.vendor
+
+
+# ---------- rowid ----------
+# Las filas del índice se identifican por rowid (búsqueda O(log n) en FTS5; las
+# columnas UNINDEXED se recorren enteras). Product usa UUID, así que el rowid son
+# los 63 bits altos del UUID: colisión prácticamente imposible y calculable tanto
+# en Python como en SQL (función fts_rowid registrada en la conexión).
+def _rowid(pk):
+    return uuid.UUID(str(pk)).int >> 65
+
+
+def _register_rowid_function(conn):
+    conn.ensure_connection()
+    conn.connection.create_function("fts_rowid", 1, _rowid, deterministic=True)
+
+
+_INSERT_SELECT = (
+    f"INSERT INTO {FTS_TABLE} (rowid, product_id, categoria_id, nombre, descripcion, categoria) "
+    "SELECT fts_rowid(p.id), p.id, p.categoria_id, p.nombre, p.descripcion, c.nombre "
+    "FROM catalog_product p JOIN catalog_category c ON c.id = p.categoria_id "
+    "WHERE p.activo"
+)
+
+
+# ---------- Mantenimiento incremental (solo SQLite) ----------
+def _db_id(value):
+    # SQLite guarda los UUIDField como hex de 32 caracteres
+    return uuid.UUID(str(value)).hex
+
+
+def needs_reindex(product: Product, update_fields=None):
+    """
+    False si el guardado no tocó ningún campo indexado (SEARCH_FIELDS): p.ej.
+    cambios de precio, stock o imágenes no reescriben el índice.
+    """
+    if update_fields is not None and not {"categoria", *SEARCH_FIELDS} & set(update_fields):
+        return False
+    loaded = getattr(product, "_search_state", None)
+    return loaded is None or loaded != search_state(product)
+
+
+def index_product(product: Product):
+    """(Re)indexa un producto. Los inactivos se sacan del índice."""
+    if _vendor() != "sqlite":
+        return
+    rowid = _rowid(product.pk)
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [rowid])
+        if product.activo:
+            cur.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, product_id, categoria_id, nombre, descripcion, categoria) "
+                "SELECT %s, %s, %s, %s, %s, nombre FROM catalog_category WHERE id = %s",
+                [
+                    rowid, _db_id(product.pk), _db_id(product.categoria_id),
+                    product.nombre, product.descripcion, _db_id(product.categoria_id),
+                ],
+            )
+    product._search_state = search_state(product)
+
+
+def unindex_product(pk):
+    if _vendor() != "sqlite":
+        return
+    with connection.cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [_rowid(pk)])
+
+
+def reindex_category(category):
+    """Actualiza el nombre de categoría en todas las filas del índice que la usan."""
+    if _vendor() != "sqlite":
+        return
+    ids = Product.objects.filter(categoria=category, activo=True).values_list("pk", flat=True)
+    with connection.cursor() as cur:
+        cur.executemany(
+            f"UPDATE {FTS_TABLE} SET categoria = %s WHERE rowid = %s",
+            [(category.nombre, _rowid(pk)) for pk in ids],
+        )
+
+
+def rebuild_index(product_ids=None, batch_size=500):
+    """
+    Reconstruye el índice completo, o solo el de `product_ids` (p.ej. tras una
+    importación masiva que no dispara señales).
+    """
+    if _vendor() != "sqlite":
+        return
+    _register_rowid_function(connection)
+    with connection.cursor() as cur:
+        if product_ids is None:
+            cur.execute(f"DELETE FROM {FTS_TABLE}")
+            cur.execute(_INSERT_SELECT)
+            return
+        product_ids = list(product_ids)
+        for i in range(0, len(product_ids), batch_size):
+            batch = product_ids[i:i + batch_size]
+            cur.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(_rowid(pk),) for pk in batch])
+            marks = ", ".join(["%s"] * len(batch))
+            cur.execute(_INSERT_SELECT + f" AND p.id IN ({marks})", [_db_id(pk) for pk in batch])
+
+
+# ---------- Consulta ----------
+def _ranked_ids_sqlite(tokens, limit):
+    match = " ".join(f'"{t}"*' for t in tokens)
+    with connection.cursor() as cur:
+        # pesos bm25 por columna: product_id, categoria_id, nombre, descripcion, categoria
+        cur.execute(
+            f"SELECT product_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, 0, 0, 10.0, 2.0, 4.0) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def _ranked_ids_postgres(tokens, limit):
+    tsquery = " & ".join(f"{t}:*" for t in tokens)
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT p.id FROM catalog_product p "
+            f"JOIN catalog_category c ON c.id = p.categoria_id, "
+            f"to_tsquery(%s, %s) q "
+            f"WHERE p.activo AND ({PG_DOCUMENT} @@ q OR to_tsvector(%s, c.nombre) @@ q) "
+            f"ORDER BY ts_rank({PG_DOCUMENT}, q) + 0.4 * ts_rank(to_tsvector(%s, c.nombre), q) DESC "
+            f"LIMIT %s",
+            [PG_CONFIG, tsquery, PG_CONFIG, PG_CONFIG, limit],
+        )
+        return [row[0] for row in cur.fetchall()]
+
+
+def search_products(query, limit=48):
+    """Devuelve una lista de productos activos ordenados por relevancia."""
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    qs = Product.objects.activos().select_related("categoria")
+    vendor = _vendor()
+    if vendor == "sqlite":
+        ids = _ranked_ids_sqlite(tokens, limit)
+    elif vendor == "postgresql":
+        ids = _ranked_ids_postgres(tokens, limit)
+    else:
+        cond = Q()
+        for t in tokens:
+            cond &= Q(nombre__icontains=t) | Q(descripcion__icontains=t) | Q(categoria__nombre__icontains=t)
+        return list(qs.filter(cond)[:limit])
+
+    field = Product._meta.pk
+    ids = [field.to_python(pk) for pk in ids]
+    found = qs.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
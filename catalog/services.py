@@ -0,0 +1,100 @@
+"""
+Payload cacheado del detalle de producto (read-through).
+
+La clave es el slug y el payload se guarda junto a las versiones por objeto
+(versioning.object_version_key) de lo que muestra: el producto (incluye su
+inventario), su categoría, cada relacionado y las listas de relacionados. Al
+leerlo se comparan con las actuales en una sola ida a la caché; guardar un
+Product, Inventory o Category sube solo su versión (signals.py), así que una
+venta de otro producto no invalida este detalle.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Product, RelatedKind, RelatedProduct
+from .versioning import RELATIONS_VERSION_KEY, get_versions, object_version_key
+
+RELATED_LIMIT = 8
+BOUGHT_TOGETHER_LIMIT = 4
+
+
+def _detail_key(slug):
+    return f"catalog:product:{slug}"
+
+
+def _stamp_keys(payload):
+    product = payload["product"]
+    keys = [
+        object_version_key("product", product.pk),
+        object_version_key("category", product.categoria_id),
+        RELATIONS_VERSION_KEY,
+    ]
+    keys += [object_version_key("product", p.pk) for p in payload["related"] + payload["bought_together"]]
+    return keys
+
+
+def related_products(product, tipo=RelatedKind.SIMILAR, limit=RELATED_LIMIT):
+    """Productos relacionados precalculados: una consulta indexada (producto, tipo, posicion)."""
+    rows = (
+        RelatedProduct.objects
+        .filter(producto=product, tipo=tipo, relacionado__activo=True)
+        .select_related("relacionado")
+        .order_by("posicion")[:limit]
+    )
+    return [r.relacionado for r in rows]
+
+
+def get_product_detail(slug):
+    """
+    {"product": Product (con categoria e inventario ya cargados), "related": [Product],
+     "bought_together": [Product]}
+    o None si no existe. En caché: 0 consultas; sin caché: 3.
+    """
+    key = _detail_key(slug)
+    cached = cache.get(key)
+    if cached is not None:
+        stamp, payload = cached
+        if get_versions(stamp) == stamp:
+            return payload
+
+    product = (
+        Product.objects.select_related("categoria", "inventario")
+        .filter(slug=slug)
+        .first()
+    )
+    if product is None:
+        return None
+
+    payload = {
+        "product": product,
+        "related": related_products(product),
+        "bought_together": related_products(product, RelatedKind.COMPRADOS_JUNTOS, limit=BOUGHT_TOGETHER_LIMIT),
+    }
+    stamp = get_versions(_stamp_keys(payload))
+    cache.set(key, (stamp, payload), getattr(settings, "CATALOG_DETAIL_TIMEOUT", 60 * 60))
+    return payload
+
+
+def bought_together_for(product_ids, limit=BOUGHT_TOGETHER_LIMIT):
+    """
+    "Comprados juntos" para un conjunto de productos (p.ej. el carrito): los
+    vecinos de mayor score que no estén ya en el conjunto. Una sola consulta.
+    """
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    rows = (
+        RelatedProduct.objects
+        .filter(producto_id__in=product_ids, tipo=RelatedKind.COMPRADOS_JUNTOS, relacionado__activo=True)
+        .exclude(relacionado_id__in=product_ids)
+        .select_related("relacionado")
+        .order_by("-score", "posicion")[: limit * len(product_ids)]
+    )
+    seen, out = set(), []
+    for r in rows:
+        if r.relacionado_id not in seen:
+            seen.add(r.relacionado_id)
+            out.append(r.relacionado)
+            if len(out) == limit:
+                break
+    return out
@@ -1,8 +1,71 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Product, Inventory
+from .models import Category, Product, Inventory
+from . import search, versioning
 
 @receiver(post_save, sender=Product)
 def create_inventory(sender, instance: Product, created, **kwargs):
     if created and not hasattr(instance, "inventario"):
         Inventory.objects.create(producto=instance, sku=f"SKU-{str(instance.id)[:8]}")
+
+
+@receiver(post_delete, sender=Inventory)
+def clear_en_stock(sender, instance: Inventory, **kwargs):
+    # sin inventario no hay stock (equivale al JOIN que hacía disponibles())
+    Product.objects.filter(pk=instance.producto_id).update(en_stock=False)
+
+
+@receiver(post_delete, sender=Product)
+def decrement_category_count(sender, instance: Product, **kwargs):
+    # cubre delete() de instancia y de queryset (el alta/edición la maneja Product.save)
+    if instance.activo and instance.categoria_id:
+        Category.objects.filter(pk=instance.categoria_id).ajustar_conteo(-1)
+
+
+# ---------- Índice de búsqueda ----------
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance: Product, created, update_fields=None, **kwargs):
+    # guardados que no tocan nombre/descripción/categoría/activo no reescriben el índice
+    if created or search.needs_reindex(instance, update_fields):
+        search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product_for_search(sender, instance: Product, **kwargs):
+    search.unindex_product(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_for_search(sender, instance: Category, created, **kwargs):
+    if not created:
+        search.reindex_category(instance)
+
+
+# ---------- Versiones por objeto (detalle cacheado, ver services.py) ----------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_product_version(sender, instance: Product, **kwargs):
+    versioning.bump_versions_on_commit([versioning.object_version_key("product", instance.pk)])
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+def bump_inventory_product_version(sender, instance: Inventory, **kwargs):
+    versioning.bump_versions_on_commit([versioning.object_version_key("product", instance.producto_id)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_version(sender, instance: Category, **kwargs):
+    versioning.bump_versions_on_commit([versioning.object_version_key("category", instance.pk)])
+
+
+# ---------- Versión del catálogo ----------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_catalog_version(sender, **kwargs):
+    versioning.bump_on_commit()
@@ -0,0 +1,47 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from catalog import fragments
+
+register = template.Library()
+
+
+class CatalogFragmentNode(template.Node):
+    def __init__(self, name, vary_on, nodelist):
+        self.name = name
+        self.vary_on = vary_on
+        self.nodelist = nodelist
+
+    def render(self, context):
+        request = context.get("request")
+        vary = [v.resolve(context) for v in self.vary_on]
+        key = fragments.fragment_key(self.name, request, *vary)
+
+        html = fragments.get_fragment(key)
+        if html is None:
+            with context.push(csrf_token=fragments.CSRF_PLACEHOLDER):
+                html = self.nodelist.render(context)
+            fragments.set_fragment(key, html)
+
+        token = context.get("csrf_token")
+        return mark_safe(html.replace(fragments.CSRF_PLACEHOLDER, escape(str(token)) if token else ""))
+
+
+@register.tag
+def catalog_fragment(parser, token):
+    """
+    Cachea el bloque según la versión del catálogo y los parámetros GET:
+
+        {% catalog_fragment "product_grid" [vary_on ...] %} ... {% endcatalog_fragment %}
+
+    Los `{% csrf_token %}` de dentro se reponen en cada request.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' requiere un nombre de fragmento.")
+    name = bits[1].strip("\"'")
+    vary_on = [parser.compile_filter(b) for b in bits[2:]]
+    nodelist = parser.parse(("endcatalog_fragment",))
+    parser.delete_first_token()
+    return CatalogFragmentNode(name, vary_on, nodelist)
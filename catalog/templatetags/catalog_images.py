@@ -0,0 +1,57 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from catalog import images
+
+register = template.Library()
+
+# `sizes` por defecto según dónde se muestra cada variante (ver styles.css)
+DEFAULT_SIZES = {
+    "card": "(max-width: 600px) 100vw, 320px",
+    "detail": "(max-width: 900px) 100vw, 900px",
+    "thumb": "96px",
+}
+
+
+def _srcset(entries):
+    return ", ".join(f"{url} {width}w" for width, url in entries)
+
+
+@register.simple_tag
+def product_image(product, variant="card", css_class="", sizes=None, lazy=True):
+    """
+    <picture> con srcset WebP + JPEG para una variante de la imagen del producto:
+
+        {% product_image p "card" %}
+        {% product_image product "detail" lazy=False %}
+        {% product_image it.producto "thumb" css_class="thumb" %}
+
+    Si el producto aún no tiene variantes generadas, usa imagen_url tal cual.
+    Devuelve "" si no hay imagen.
+    """
+    urls = images.variant_urls(product, variant)
+    if not urls and not product.imagen_url:
+        return ""
+    alt = product.nombre
+    loading = "lazy" if lazy else "eager"
+    priority = "auto" if lazy else "high"
+    if not urls:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            product.imagen_url, alt, css_class, loading,
+        )
+
+    jpeg = urls["jpeg"]
+    width, fallback = jpeg[0]
+    ratio = images.VARIANTS[variant][1]
+    height = round(width * ratio) if ratio else round(width * product.imagenes["h"] / product.imagenes["w"])
+    sizes = sizes or DEFAULT_SIZES.get(variant, "100vw")
+    sources = format_html_join(
+        "", '<source type="image/{}" srcset="{}" sizes="{}">',
+        ((fmt, _srcset(entries), sizes) for fmt, entries in urls.items() if fmt != "jpeg"),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" '
+        'loading="{}" decoding="async" fetchpriority="{}"></picture>',
+        sources, fallback, _srcset(jpeg), sizes, width, height, alt, css_class, loading, priority,
+    )
@@ -1,12 +1,19 @@
 from django.urls import path
 from .views import ProductListView, ProductDetailView
-from . import views
+from . import api, views
 
 app_name='catalog'
 
 urlpatterns = [
     path('', ProductListView.as_view(), name='product_list'),
     path('p/<slug:slug>/', ProductDetailView.as_view(), name='product_detail'),
+    path("buscar/", views.SearchView.as_view(), name="search"),
     path("categorias/", views.CategoryListView.as_view(), name="category_list"),
     path("categorias/<slug:slug>/", views.CategoryDetailView.as_view(), name="category_detail"),
+    # API JSON de solo lectura (ver api.py)
+    path("api/productos/", api.product_list, name="api_product_list"),
+    path("api/productos/export/", api.product_export, name="api_product_export"),
+    path("api/productos/<slug:slug>/", api.product_detail, name="api_product_detail"),
+    path("api/categorias/", api.category_list, name="api_category_list"),
+    path("api/autocompletar/", api.autocomplete, name="api_autocomplete"),
 ]
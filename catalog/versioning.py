@@ -0,0 +1,93 @@
+"""
+Número de versión ("generación") del catálogo.
+
+Cualquier cambio en Product/Inventory/Category lo incrementa (ver signals.py),
+así que las estructuras derivadas del catálogo —índices en memoria, fragmentos
+cacheados— solo tienen que comparar su versión con la actual para saber si
+siguen vigentes, sin consultar la base de datos.
+
+Vive en la caché de Django: con un backend compartido (Redis/Memcached) todos
+los workers ven el mismo número.
+
+Junto a la versión se guarda el momento del último cambio (`catalog_last_modified`),
+que las vistas usan como Last-Modified (ver core/conditional.py).
+
+Las cachés que dependen de pocos objetos (el detalle de un producto) usan en
+cambio versiones por objeto (`object_version_key`): una venta cambia el
+inventario de un producto y solo invalida lo que muestra ese producto.
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_CHANGED_AT_KEY = "catalog:changed_at"
+# listas de relacionados (las regeneran los comandos build_*)
+RELATIONS_VERSION_KEY = "catalog:version:relations"
+
+
+def get_catalog_version() -> int:
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # valor inicial basado en el reloj: si la clave se pierde (reinicio o
+        # desalojo), la nueva versión nunca coincide con una anterior
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY, 0)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+    cache.set(CATALOG_CHANGED_AT_KEY, time.time(), None)
+
+
+def catalog_last_modified() -> datetime:
+    """
+    Momento del último cambio del catálogo. Se registra al subir la versión, así
+    que cubre también borrados y cambios de inventario; si la clave no está
+    (caché recién creada) se parte de max(updated_at) de productos y categorías.
+    """
+    changed_at = cache.get(CATALOG_CHANGED_AT_KEY)
+    if changed_at is None:
+        from .models import Product
+
+        latest = Product.objects.aggregate(m=Max("updated_at"))["m"]
+        changed_at = latest.timestamp() if latest else 0.0
+        cache.add(CATALOG_CHANGED_AT_KEY, changed_at, None)
+    return datetime.fromtimestamp(changed_at, tz=dt_timezone.utc)
+
+
+def bump_on_commit():
+    """Incrementa la versión cuando la transacción actual confirme (o ya, si no hay)."""
+    transaction.on_commit(bump_catalog_version)
+
+
+# ---------- Versiones por objeto ----------
+def object_version_key(kind, pk):
+    return f"catalog:version:{kind}:{pk}"
+
+
+def get_versions(keys) -> dict:
+    """{clave: versión} en una ida a la caché; las que no estén se inicializan con el reloj."""
+    keys = list(keys)
+    versions = cache.get_many(keys)
+    missing = [k for k in keys if k not in versions]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def bump_versions_on_commit(keys):
+    """Cambia las versiones de `keys` al confirmar (un set_many con el reloj, siempre mayor)."""
+    keys = list(keys)
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
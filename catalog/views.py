@@ -1,13 +1,84 @@
-from django.db.models import Count, Q
+from django.http import Http404
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView
-from django.core.paginator import Paginator
+from core.conditional import conditional_page
 from .models import Category, Product
+from .facets import FacetFilters, get_facet_index
+from .pagination import KeysetPaginator, SORTS
+from .search import search_products
+from .services import get_product_detail
+from .versioning import catalog_last_modified, get_catalog_version
 
-class ProductListView(ListView):
+
+def catalog_validator(request, *args, **kwargs):
+    """Listados: dependen de todo el catálogo (facetas, conteos), así que validan contra su versión."""
+    return catalog_last_modified(), get_catalog_version()
+
+
+def product_validator(request, slug):
+    """
+    Detalle: la ETag depende solo de lo que muestra la página (producto, categoría,
+    stock y relacionados), así que cambios en otros productos no la invalidan.
+    Sale del payload cacheado: 0 consultas si está en caché.
+    """
+    payload = get_product_detail(slug)
+    if payload is None:
+        return None
+    product = payload["product"]
+    inv = getattr(product, "inventario", None)
+    key = (
+        product.updated_at.timestamp(),
+        # imagenes se actualiza con update() (sin tocar updated_at)
+        (product.imagenes or {}).get("hash"),
+        (product.categoria.nombre, product.categoria.slug),
+        (inv.stock, inv.reservado) if inv else None,
+        [(p.pk, p.updated_at.timestamp()) for p in payload["related"] + payload["bought_together"]],
+    )
+    return catalog_last_modified(), key
+
+
+class KeysetPaginationMixin:
+    """Paginación por cursor + orden (?orden=...&cursor=...) para listados de productos."""
+    products_per_page = 12
+
+    def paginate_products(self, queryset):
+        paginator = KeysetPaginator(
+            queryset, self.products_per_page, sort=self.request.GET.get("orden")
+        )
+        page = paginator.get_page(self.request.GET.get("cursor"))
+        # querystring sin el cursor, para armar los enlaces anterior/siguiente
+        params = self.request.GET.copy()
+        params.pop("cursor", None)
+        params["orden"] = paginator.sort
+        return page, {
+            "page_obj": page,
+            "sort": paginator.sort,
+            "sort_options": [(key, label) for key, (label, _, _) in SORTS.items()],
+            "querystring": params.urlencode(),
+        }
+
+
+@method_decorator(conditional_page(catalog_validator), name="get")
+class ProductListView(KeysetPaginationMixin, ListView):
     model = Product
     template_name = 'catalog/product_list.html'
     context_object_name = 'products'
 
+    def get_queryset(self):
+        self.facet_index = get_facet_index()
+        self.filters = FacetFilters.from_querydict(self.request.GET, self.facet_index)
+        return self.filters.apply(Product.objects.activos())
+
+    def get_context_data(self, **kwargs):
+        page, extra = self.paginate_products(self.object_list)
+        ctx = super().get_context_data(object_list=page, **kwargs)
+        ctx.update(extra)
+        ctx["facets"] = self.facet_index.facets(self.filters)
+        ctx["has_filters"] = bool(self.filters)
+        return ctx
+
+
+@method_decorator(conditional_page(product_validator), name="get")
 class ProductDetailView(DetailView):
     model = Product
     template_name = 'catalog/product_detail.html'
@@ -15,20 +86,32 @@ class ProductDetailView(DetailView):
     slug_field = 'slug'
     slug_url_kwarg = 'slug'
 
+    def get_object(self, queryset=None):
+        # payload cacheado (producto + categoría + inventario + relacionados)
+        self.payload = get_product_detail(self.kwargs[self.slug_url_kwarg])
+        if self.payload is None:
+            raise Http404("Producto no encontrado")
+        return self.payload["product"]
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["related"] = self.payload["related"]
+        ctx["bought_together"] = self.payload["bought_together"]
+        return ctx
+
+
+@method_decorator(conditional_page(catalog_validator), name="get")
 class CategoryListView(ListView):
     model = Category
     template_name = "catalog/category_list.html"
     context_object_name = "categories"
 
     def get_queryset(self):
-        # categorías ordenadas por nombre + conteo de productos ACTIVO
-        return (
-            Category.objects
-            .annotate(product_count=Count("productos", filter=Q(productos__activo=True)))
-            .order_by("nombre")
-        )
+        # el conteo de productos activos ya viene en Category.active_product_count
+        return Category.objects.order_by("nombre")
 
-class CategoryDetailView(DetailView):
+@method_decorator(conditional_page(catalog_validator), name="get")
+class CategoryDetailView(KeysetPaginationMixin, DetailView):
     model = Category
     template_name = "catalog/category_detail.html"
     context_object_name = "category"
@@ -37,13 +120,24 @@ class CategoryDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        qs = (
-            Product.objects
-            .filter(categoria=self.object, activo=True)
-            .order_by("-created_at")
-        )
-        paginator = Paginator(qs, 12)  # 12 por página
-        page_obj = paginator.get_page(self.request.GET.get("page"))
-        ctx["page_obj"] = page_obj
-        ctx["products"] = page_obj.object_list
-        return ctx
\ No newline at end of file
+        qs = Product.objects.activos().filter(categoria=self.object)
+        page, extra = self.paginate_products(qs)
+        ctx.update(extra)
+        ctx["products"] = page
+        return ctx
+
+
+@method_decorator(conditional_page(catalog_validator), name="get")
+class SearchView(ListView):
+    template_name = "catalog/search_results.html"
+    context_object_name = "products"
+    results_limit = 48
+
+    def get_queryset(self):
+        self.query = (self.request.GET.get("q") or "").strip()
+        return search_products(self.query, limit=self.results_limit)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["query"] = self.query
+        return ctx
@@ -0,0 +1,121 @@
+"""
+GET condicional (ETag / Last-Modified) para páginas HTML.
+
+Las páginas heredan de base.html, que muestra cosas del usuario (nombre/menú
+de staff, contador del carrito, mensajes, token CSRF en formularios). Por eso:
+
+- la ETag combina el validador del recurso con esas partes por usuario y con la
+  versión de las plantillas, así que un 304 nunca devuelve el header de otro;
+- el token CSRF de los formularios sale de la cookie CSRF, así que un hash de
+  su valor entra en la ETag: si el secreto cambió (rota al iniciar sesión y no
+  vuelve al cerrarla, o el navegador borró la cookie) el HTML guardado tiene un
+  token inválido y no puede volver como 304;
+- Last-Modified solo se envía si la página no varía por visitante (anónimo sin
+  carrito ni cookie CSRF): en otro caso el único validador fiable es la ETag;
+- si hay mensajes pendientes no se evalúa nada: hay que renderizar para
+  mostrarlos (y consumirlos);
+- las respuestas llevan `Cache-Control: private, no-cache` para que el
+  navegador siempre revalide (barato gracias al 304) y ningún proxy las comparta.
+
+Uso:
+
+    @conditional_page(order_validator)
+    def order_detail(request, numero): ...
+
+El validador recibe los mismos argumentos que la vista y devuelve
+`(last_modified, clave)` o None para servir la página sin validadores (p.ej. si
+el recurso no existe y la vista dará 404). La clave identifica el estado del
+recurso y es lo que entra en la ETag; `last_modified` puede ser más grueso
+(p.ej. el último cambio de todo el catálogo) siempre que nunca sea anterior a
+un cambio que afecte a la página.
+"""
+import hashlib
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from cart.context_processors import cart_count
+
+_templates_version = None
+
+
+def templates_version():
+    """Cambia cuando se despliegan plantillas nuevas (mtime más reciente de los directorios de plantillas)."""
+    global _templates_version
+    if _templates_version is None:
+        from django.template.utils import get_app_template_dirs
+
+        dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get("DIRS", [])]
+        dirs += list(get_app_template_dirs("templates"))
+        latest = 0
+        for d in dirs:
+            for path in d.rglob("*.html"):
+                latest = max(latest, path.stat().st_mtime_ns)
+        _templates_version = str(latest)
+    return _templates_version
+
+
+def user_state(request):
+    """
+    Partes de la página que dependen del usuario y no del recurso. Devuelve una
+    tupla vacía si la página es igual para cualquier visitante anónimo.
+    """
+    user = getattr(request, "user", None)
+    authenticated = user is not None and user.is_authenticated
+    count = cart_count(request)["cart_count"]
+    if not authenticated and not count:
+        return ()
+    return (
+        user.pk if authenticated else "",
+        int(authenticated and user.is_staff),
+        int(authenticated and user.is_superuser),
+        count,
+    )
+
+
+def csrf_state(request):
+    """Hash de la cookie CSRF ('' si no hay): el token de los formularios depende de ella."""
+    value = request.COOKIES.get(settings.CSRF_COOKIE_NAME, "")
+    return hashlib.md5(value.encode(), usedforsecurity=False).hexdigest() if value else ""
+
+
+def compute_etag(request, key, state):
+    raw = "|".join(map(str, (request.get_full_path(), key, templates_version(), *state, csrf_state(request))))
+    return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+
+def conditional_page(validator):
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or get_messages(request):
+                return view(request, *args, **kwargs)
+            validated = validator(request, *args, **kwargs)
+            if validated is None:
+                return view(request, *args, **kwargs)
+
+            last_modified, key = validated
+            state = user_state(request)
+            etag = compute_etag(request, key, state)
+            # sin partes por visitante, Last-Modified también es un validador correcto
+            per_visitor = state or settings.CSRF_COOKIE_NAME in request.COOKIES
+            timestamp = None if per_visitor else int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response.headers.setdefault("ETag", etag)
+            if timestamp is not None:
+                response.headers.setdefault("Last-Modified", http_date(timestamp))
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return inner
+
+    return decorator
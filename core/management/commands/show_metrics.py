@@ -0,0 +1,24 @@
+# core/management/commands/show_metrics.py
+from django.core.management.base import BaseCommand
+
+from core import metrics
+
+
+class Command(BaseCommand):
+    help = "Muestra los contadores registrados en core.metrics (opcionalmente los reinicia)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("prefix", nargs="?", default="", help="Filtra por prefijo (p.ej. 'catalog.').")
+        parser.add_argument("--reset", action="store_true", help="Pone a 0 los contadores mostrados.")
+
+    def handle(self, *args, **opts):
+        rows = {n: v for n, v in metrics.snapshot().items() if n.startswith(opts["prefix"])}
+        if not rows:
+            self.stdout.write("No hay contadores registrados.")
+            return
+        width = max(len(n) for n in rows)
+        for name, (value, help_text) in rows.items():
+            self.stdout.write(f"{name.ljust(width)}  {value:>10}  {help_text}")
+        if opts["reset"]:
+            metrics.reset(*rows)
+            self.stdout.write(self.style.WARNING("Contadores reiniciados."))
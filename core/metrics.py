@@ -0,0 +1,40 @@
+"""
+Contadores simples (hits/misses, filas evitadas, etc.) guardados en la caché
+de Django para que sean comunes a todos los workers cuando la caché es
+compartida. Se consultan con `python manage.py show_metrics`.
+"""
+from django.core.cache import cache
+
+PREFIX = "metrics:"
+
+_registry = {}
+
+
+def register(name, help_text=""):
+    """Declara un contador para que aparezca en `snapshot()` aunque valga 0."""
+    _registry[name] = help_text
+    return name
+
+
+def incr(name, delta=1):
+    key = PREFIX + name
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # no existía: la crea; si otro proceso ganó la carrera, suma encima
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def get(name):
+    return cache.get(PREFIX + name, 0)
+
+
+def reset(*names):
+    cache.delete_many([PREFIX + n for n in (names or _registry)])
+
+
+def snapshot():
+    """{nombre: (valor, descripción)} de todos los contadores registrados."""
+    values = cache.get_many([PREFIX + n for n in _registry])
+    return {n: (values.get(PREFIX + n, 0), h) for n, h in sorted(_registry.items())}
@@ -0,0 +1,155 @@
+"""
+Servidor de estáticos dentro de Django para los archivos de STATIC_ROOT.
+
+Va justo después de SecurityMiddleware y responde las peticiones bajo
+STATIC_URL sin pasar por sesiones, auth ni el router:
+
+- negocia Accept-Encoding (br > gzip) y Accept (image/webp) contra las variantes
+  que generó core.staticfiles en collectstatic, con el `Vary` correspondiente;
+- los archivos con hash del manifest se marcan `immutable` por un año; el resto
+  (nombres sin hash) con una caché corta;
+- responde 304 a If-None-Match / If-Modified-Since.
+
+El índice de archivos se arma una vez por proceso (tras un collectstatic hay que
+reiniciar los workers, como con cualquier despliegue). Si el archivo no está en
+STATIC_ROOT la petición sigue su curso normal (runserver/DEBUG lo resuelve con
+los finders).
+"""
+import json
+import mimetypes
+import os
+import threading
+from email.utils import formatdate
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_http_date_safe
+
+from .staticfiles import encoded_variants
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+DEFAULT_MAX_AGE = 60
+
+
+class _StaticFile:
+    __slots__ = ("path", "content_type", "immutable", "variants", "etag", "last_modified", "mtime")
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.immutable = immutable
+        self.mtime = int(stat.st_mtime)
+        self.etag = f'"{stat.st_size:x}-{self.mtime:x}"'
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        # [(sufijo, Content-Encoding o None, ruta)] que existen en disco
+        self.variants = []
+        for suffix in encoded_variants():
+            if os.path.exists(path + suffix):
+                self.variants.append((suffix, "br" if suffix == ".br" else "gzip", path + suffix))
+        if os.path.exists(path + ".webp"):
+            self.variants.append((".webp", None, path + ".webp"))
+
+
+def _accepts_encoding(header, coding):
+    """True si `coding` aparece en Accept-Encoding con q > 0."""
+    for part in header.split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        if token.lower() != coding:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class StaticFilesMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.root = str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None
+        self._files = None
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if self.root and request.path_info.startswith(self.prefix) and request.method in ("GET", "HEAD"):
+            static_file = self.files.get(request.path_info[len(self.prefix):])
+            if static_file is not None:
+                return self.serve(request, static_file)
+        return self.get_response(request)
+
+    # ————— Índice —————
+    @property
+    def files(self):
+        if self._files is None:
+            with self._lock:
+                if self._files is None:
+                    self._files = self._scan()
+        return self._files
+
+    def _scan(self):
+        if not os.path.isdir(self.root):
+            return {}
+        hashed = set()
+        manifest = os.path.join(self.root, "staticfiles.json")
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as fh:
+                hashed = set(json.load(fh).get("paths", {}).values())
+        skip = {".gz", ".br", ".webp"}
+        files = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                base, ext = os.path.splitext(name)
+                # las variantes se sirven a través del archivo original, no por su propia URL
+                if ext in skip and os.path.exists(os.path.join(self.root, base)):
+                    continue
+                files[name] = _StaticFile(path, immutable=name in hashed)
+        return files
+
+    # ————— Respuesta —————
+    def _negotiate(self, request, static_file):
+        accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        accept = request.META.get("HTTP_ACCEPT", "")
+        for suffix, encoding, path in static_file.variants:
+            if encoding and _accepts_encoding(accept_encoding, encoding):
+                return suffix, path, encoding, static_file.content_type
+            if suffix == ".webp" and "image/webp" in accept:
+                return suffix, path, None, "image/webp"
+        return "", static_file.path, None, static_file.content_type
+
+    def serve(self, request, static_file):
+        suffix, path, encoding, content_type = self._negotiate(request, static_file)
+        # la ETag distingue la representación elegida
+        etag = static_file.etag[:-1] + suffix + '"'
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+        if (if_none_match and etag in if_none_match) or (
+            not if_none_match and if_modified_since and if_modified_since >= static_file.mtime
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+            if encoding:
+                response["Content-Encoding"] = encoding
+            response["Content-Length"] = os.path.getsize(path)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = static_file.last_modified
+        if static_file.immutable:
+            response["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            response["Cache-Control"] = f"public, max-age={DEFAULT_MAX_AGE}"
+        if any(enc for _, enc, _ in static_file.variants):
+            patch_vary_headers(response, ["Accept-Encoding"])
+        if any(sfx == ".webp" for sfx, _, _ in static_file.variants):
+            patch_vary_headers(response, ["Accept"])
+        return response
@@ -0,0 +1,136 @@
+"""
+Pipeline de estáticos para `collectstatic`.
+
+`OptimizedManifestStaticFilesStorage` extiende el storage con manifest de
+Django (nombres con hash de contenido + staticfiles.json) y además:
+
+- recomprime las imágenes al copiarlas y reduce las que superan
+  STATIC_IMAGE_MAX_WIDTH (el logo PNG original pesa 1,4 MB);
+- deja junto a cada imagen una variante `<archivo>.webp`;
+- deja junto a cada archivo de texto (css, js, svg…) `<archivo>.gz` y, si está
+  instalado el paquete `brotli`, `<archivo>.br`.
+
+Las variantes las sirve core.middleware.StaticFilesMiddleware negociando
+Accept-Encoding / Accept. Pillow y brotli son opcionales: sin ellos se omite
+esa parte del pipeline.
+"""
+import gzip
+import io
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depende del entorno
+    Image = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".mjs", ".svg", ".json", ".map", ".txt", ".html", ".xml", ".ico"}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+# las variantes comprimidas que no ahorran al menos esto no se guardan
+MIN_SAVING = 0.05
+
+
+def encoded_variants():
+    """Extensiones de variantes comprimidas que produce este entorno, en orden de preferencia."""
+    return [".br", ".gz"] if brotli is not None else [".gz"]
+
+
+def _ext(name):
+    return os.path.splitext(name)[1].lower()
+
+
+def gzip_bytes(data):
+    # mtime=0: misma entrada -> mismos bytes (builds reproducibles)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def optimize_image(data, ext, max_width=None):
+    """Reduce (si supera max_width) y recomprime una imagen. Devuelve None si no mejora."""
+    if Image is None:
+        return None
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    if max_width and img.width > max_width:
+        img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+    buf = io.BytesIO()
+    if ext == ".png":
+        img.save(buf, "PNG", optimize=True)
+    else:
+        img.convert("RGB").save(buf, "JPEG", quality=85, optimize=True, progressive=True)
+    out = buf.getvalue()
+    return out if len(out) < len(data) else None
+
+
+def webp_bytes(data):
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=85, method=6)
+    return buf.getvalue()
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # un archivo que falte en el manifest (p.ej. tests sin collectstatic) se sirve sin hash
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def _save(self, name, content):
+        # Se llama tanto para la copia sin hash como para la copia con hash; ambas
+        # parten del archivo fuente, así que la optimización no se acumula.
+        if _ext(name) in IMAGE_EXTENSIONS and Image is not None:
+            data = content.read()
+            optimized = optimize_image(data, _ext(name), getattr(settings, "STATIC_IMAGE_MAX_WIDTH", None))
+            content = ContentFile(optimized if optimized is not None else data)
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            ext = _ext(name)
+            if ext in COMPRESSIBLE_EXTENSIONS:
+                self._write_encoded(name)
+            elif ext in IMAGE_EXTENSIONS and Image is not None:
+                self._write_webp(name)
+
+    def _write_encoded(self, name):
+        with self.open(name) as fh:
+            data = fh.read()
+        encoders = [(".gz", gzip_bytes)]
+        if brotli is not None:
+            encoders.insert(0, (".br", lambda d: brotli.compress(d, quality=11)))
+        for suffix, encode in encoders:
+            encoded = encode(data)
+            if len(encoded) <= len(data) * (1 - MIN_SAVING):
+                self._replace(name + suffix, encoded)
+
+    def _write_webp(self, name):
+        with self.open(name) as fh:
+            data = fh.read()
+        webp = webp_bytes(data)
+        if len(webp) < len(data):
+            self._replace(name + ".webp", webp)
+
+    def _replace(self, name, data):
+        if self.exists(name):
+            self.delete(name)
+        # _save del padre: estas variantes no se vuelven a optimizar
+        super()._save(name, ContentFile(data))
@@ -29,7 +29,10 @@ ALLOWED_HOSTS: list[str] = []
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# inactividad tras la cual un carrito se ignora; `manage.py expire_carts --loop` los marca y limpia en segundo plano
 CART_TTL_MINUTES = 45
+# Carrito de invitados: DatabaseStorage, CookieStorage o CacheStorage (ver cart/storage/__init__.py)
+CART_STORAGE_BACKEND = "cart.storage.db.DatabaseStorage"
 
 # Application definition
 
@@ -51,10 +54,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "cart.middleware.CartMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -92,6 +97,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# En producción usar un backend compartido (Redis/Memcached) para que la
+# versión del catálogo y los fragmentos cacheados sean comunes a todos los workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "glowbox",
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -121,6 +139,13 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATICFILES_DIRS = [ BASE_DIR / 'static' ]
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# collectstatic: nombres con hash + manifest, variantes .gz/.br/.webp (ver core/staticfiles.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.staticfiles.OptimizedManifestStaticFilesStorage"},
+}
+# las imágenes más anchas se reducen al copiarlas (el logo se muestra a <= 200px de alto)
+STATIC_IMAGE_MAX_WIDTH = 800
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
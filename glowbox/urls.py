@@ -15,6 +15,8 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -26,3 +28,6 @@ urlpatterns = [
     path("accounts/", include("django.contrib.auth.urls")),
     path("accounts/", include(("accounts.urls", "accounts"), namespace="accounts")),
 ]
+
+# miniaturas de producto (MEDIA_ROOT) en desarrollo; en producción las sirve el servidor web
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
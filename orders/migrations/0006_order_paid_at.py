@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_paid_at(apps, schema_editor):
+    # sin registro del momento del pago, los pedidos ya pagados toman su created_at
+    Order = apps.get_model("orders", "Order")
+    Order.objects.filter(status__in=["PAGADA", "ENVIADA", "ENTREGADA"]).update(paid_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_order_shipping_carrier_order_tracking_code_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="paid_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+    ]
@@ -44,9 +44,18 @@ class Order(UUIDModel, TimeStampedModel):
     shipping_carrier = models.CharField(max_length=40, blank=True)   
     tracking_code    = models.CharField(max_length=60, blank=True) 
 
+    paid_at = models.DateTimeField(null=True, blank=True, db_index=True)
     shipped_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
 
+    def save(self, *args, **kwargs):
+        # auto_now no se aplica con update_fields si no incluye updated_at, y el
+        # detalle del pedido lo usa como validador HTTP (Last-Modified/ETag)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "updated_at" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "updated_at"]
+        super().save(*args, **kwargs)
+
     def set_tracking(self, carrier: str, code: str):
     
         self.shipping_carrier = (carrier or "").strip()
@@ -63,7 +72,8 @@ class Order(UUIDModel, TimeStampedModel):
     def mark_paid(self):
         if self.status in {OrderStatus.PENDIENTE, OrderStatus.CANCELADA}:
             self.status = OrderStatus.PAGADA
-            self.save(update_fields=["status"])
+            self.paid_at = timezone.now()
+            self.save(update_fields=["status", "paid_at"])
 
     def mark_shipped(self):
         if self.status == OrderStatus.PAGADA:
@@ -2,6 +2,7 @@
 from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from .models import Payment, PaymentStatus, OrderStatus
 from catalog.models import Inventory
@@ -38,7 +39,8 @@ def sync_inventory_with_payment(sender, instance: Payment, created, **kwargs):
             
             if hasattr(orden, "status"):
                 orden.status = OrderStatus.PAGADA
-                orden.save(update_fields=["status"])
+                orden.paid_at = timezone.now()
+                orden.save(update_fields=["status", "paid_at"])
 
             instance.captured_applied = True
             instance.save(update_fields=["captured_applied"])
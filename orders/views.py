@@ -9,7 +9,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.crypto import get_random_string
 
-from cart.utils import get_or_create_active_cart
+from core.conditional import conditional_page
 
 from .forms import TrackingForm
 from .models import (
@@ -60,7 +60,7 @@ def _validate_cart_stock(cart):
 # ----------------------------
 @transaction.atomic
 def checkout(request):
-    cart = get_or_create_active_cart(request)
+    cart = request.cart
 
     # 1) Debe iniciar sesión
     if not request.user.is_authenticated:
@@ -68,6 +68,10 @@ def checkout(request):
         login_url = reverse("login")  # nombre de tu URL de login
         return redirect(f"{login_url}?{urlencode({'next': request.path})}")
 
+    if not cart.items_count:
+        messages.warning(request, "Tu carrito está vacío.")
+        return redirect("cart:detail")
+
     # 2) Validar stock
     try:
         _validate_cart_stock(cart)
@@ -111,9 +115,10 @@ def checkout(request):
     pago.capture(transaction_id=f"MAN-{numero}")
 
     # 6) Limpiar/expirar carrito
-    cart.items.all().delete()
+    cart.clear()
     cart.expire()
     request.session.pop("cart_id", None)
+    request.session.pop("cart_count", None)
 
     # 7) Ir a página de éxito
     return redirect("orders:success", numero=orden.numero)
@@ -124,6 +129,14 @@ def success(request, numero: str):
     return render(request, "orders/checkout_success.html", {"orden": orden})
 
 
+def order_validator(request, numero: str):
+    updated_at = Order.objects.filter(numero=numero).values_list("updated_at", flat=True).first()
+    if updated_at is None:
+        return None
+    return updated_at, updated_at.timestamp()
+
+
+@conditional_page(order_validator)
 def order_detail(request, numero: str):
     orden = get_object_or_404(Order, numero=numero)
     return render(request, "orders/order_detail.html", {"orden": orden})